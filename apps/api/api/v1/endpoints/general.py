@@ -1,5 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 from core.config import settings
+from src.python.utils.db_pools import health_checker
 
 router = APIRouter()
 
@@ -12,12 +13,17 @@ def read_root():
     }
 
 @router.get("/health")
-def health_check():
-    return {
-        "status": "healthy",
-        "services": {
-            "api": "online",
-            "database": "checking...", # TODO: Implement real DB check
-            "redis": "checking..."     # TODO: Implement real Redis check
-        }
-    }
+async def health_check(response: Response):
+    # Probes run concurrently under timeouts; results are cached briefly for load balancers
+    report = await health_checker.check()
+    if report["status"] == "unhealthy":
+        response.status_code = 503
+    return report
+
+@router.get("/ready")
+async def readiness(request: Request, response: Response):
+    # 503 until the warmup stage finished; the body is the per-phase startup report
+    report = getattr(request.app.state, "startup", None)
+    if report is None or not report.ready:
+        response.status_code = 503
+    return report.as_dict() if report is not None else {"ready": False, "phases": []}
@@ -1,9 +1,90 @@
+import sys
+import time
+import logging
+from pathlib import Path
+import asyncio
+from contextlib import asynccontextmanager
+
+_IMPORT_START = time.perf_counter()
+
+# Core engine (src/python) is imported as `src.python...` from the repo root
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+# .env is read once, here in the entrypoint, before modules pick up their settings
+from dotenv import load_dotenv
+load_dotenv()
+
 from fastapi import FastAPI
 from routers import config, bot, status
 from ws import logs, control_center
+from ws.manager import manager
 from core.config import settings
+from utils.market_calendar import calendar_service
+from utils.status_sampler import status_sampler
+from src.python.utils.log_bus import log_bus
+from src.python.utils.bot_supervisor import bot_supervisor, warm_forkserver
+from src.python.utils.db_pools import pools
+from src.python.utils.db_writer import db_writer
+from src.python.utils.startup import StartupReport, load_settings, warm_core
+from api.v1.api import api_router
+
+# Module imports stay light (no pandas/ccxt, no I/O); the heavy work is in the phases below
+IMPORT_MS = round((time.perf_counter() - _IMPORT_START) * 1000, 1)
+logger = logging.getLogger(__name__)
+
+
+async def _warm(report: StartupReport):
+    """Slow warmup after the server is up: /api/v1/ready turns 200 when it finishes."""
+    try:
+        # Heavy imports, holiday tables, calendar indexes (no index builds in-request later)
+        await warm_core(report)
+        # Pre-import pandas/ccxt in the bot forkserver so /bot/start only forks
+        async with report.phase("forkserver", required=False):
+            await asyncio.to_thread(warm_forkserver)
+        # /status and the `status` channel are fed from one background sample
+        async with report.phase("status_sampler", required=False):
+            status_sampler.start()
+            await status_sampler.current()
+        report.mark_ready()
+    except Exception as e:
+        logger.error(f"Warmup failed, staying not-ready: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    report = app.state.startup = StartupReport()
+    report.phases.append({"phase": "import", "ms": IMPORT_MS, "ok": True})
+    # Stream core-engine logs to /ws/logs and the control center
+    async with report.phase("log_bus"):
+        log_bus.install()
+        log_pump = asyncio.create_task(logs.pump_logs())
+    # .env + runtime config: read from disk once; later saves swap it in memory
+    await load_settings(report)
+    # One asyncpg + one redis.asyncio pool for the whole API (see /api/v1/health)
+    async with report.phase("pools"):
+        await pools.start(database_url=settings.DATABASE_URL, redis_url=settings.REDIS_URL)
+    # Batched COPY writer on that pool; hypertable/aggregate DDL is idempotent and
+    # retried before the first COPY if the database is not reachable yet
+    async with report.phase("db_writer", required=False):
+        await db_writer.start(schema=True)
+    # Fan broadcasts out across uvicorn workers when WS_BACKPLANE_URL is set
+    async with report.phase("backplane", required=False):
+        await manager.start_backplane()
+    warm = asyncio.create_task(_warm(report))
+    yield
+    warm.cancel()
+    await status_sampler.stop()
+    await bot_supervisor.shutdown()
+    log_pump.cancel()
+    await manager.stop_backplane()
+    await calendar_service.close()
+    await db_writer.stop()
+    await pools.close()
+
 
-app = FastAPI(title=settings.PROJECT_NAME)
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 # Include provided routers
 app.include_router(config.router)
@@ -11,6 +92,7 @@ app.include_router(bot.router)
 app.include_router(status.router)
 app.include_router(logs.router)
 app.include_router(control_center.router)
+app.include_router(api_router, prefix=settings.API_V1_STR)
 
 # Note: previous main.py had api_router from api.v1.api. 
 # If that is still needed, we should keep it. 
@@ -1,37 +1,55 @@
+from typing import Optional
 from fastapi import APIRouter, HTTPException
-import subprocess
+from src.python.utils.bot_supervisor import bot_supervisor
 
 router = APIRouter(prefix="/bot", tags=["bot"])
 
+# Every endpoint takes ?worker=<name> to target one strategy worker; default is all of them
+
+
 @router.post("/start")
-async def start_bot():
+async def start_bot(worker: Optional[str] = None):
     try:
-        # Call startup script or bot process
-        # Assuming main_bot.py is in apps/api or similar relative path, adjusting logic to be safe
-        subprocess.Popen(["python", "main_bot.py"]) 
-        return {"message": "Bot started"}
+        workers = await bot_supervisor.start(worker)
+        return {"message": "Bot started", "workers": workers}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/stop")
-async def stop_bot():
+async def stop_bot(worker: Optional[str] = None):
     try:
-        # Graceful stop logic (e.g., signal to process)
-        # This is a placeholder as actual process management would require PID tracking
-        return {"message": "Bot stopped"}
+        # Graceful: workers finish their current cycle, then SIGTERM/SIGKILL after timeouts
+        workers = await bot_supervisor.stop(worker)
+        return {"message": "Bot stopped", "workers": workers}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/kill")
-async def kill_bot():
+async def kill_bot(worker: Optional[str] = None):
     try:
-        # Immediate kill
-        # On Windows 'taskkill' might be more appropriate than 'pkill', but keeping logic generic or adapting if needed
-        import os
-        if os.name == 'nt':
-             os.system("taskkill /F /IM python.exe /T") # CAUTION: This kills ALL python processes. Prototyping safety.
-        else:
-             os.system("pkill -f main_bot.py")
-        return {"message": "Kill switch activated"}
+        # Immediate SIGKILL of the supervised bot PIDs only
+        workers = await bot_supervisor.kill(worker)
+        return {"message": "Kill switch activated", "workers": workers}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/restart")
+async def restart_bot(worker: Optional[str] = None):
+    try:
+        workers = await bot_supervisor.restart(worker)
+        return {"message": "Bot restarted", "workers": workers}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/workers")
+async def bot_workers():
+    # PID, uptime, heartbeat age, restarts and CPU/RSS per worker
+    return {"running": bot_supervisor.running, "workers": bot_supervisor.status()}
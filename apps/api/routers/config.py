@@ -1,7 +1,7 @@
+from typing import Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from dotenv import load_dotenv, set_key
-import os
+from src.python.utils.config_store import ConfigConflict, config_store
 
 router = APIRouter(prefix="/config", tags=["config"])
 
@@ -11,34 +11,41 @@ class BotConfig(BaseModel):
     riskLimit: float
     maxDrawdown: float
     strategyMode: str
+    # Optional optimistic lock: reject the save if the config changed since this version was read
+    version: Optional[int] = None
     # Future fields: dynamically added
 
-@router.get("/")
-async def get_config():
-    load_dotenv()
+def _as_response(snapshot: dict) -> dict:
     return {
-        "exchangeType": os.getenv("EXCHANGE_TYPE", "crypto"),
-        "exchangeName": os.getenv("EXCHANGE_NAME", "Binance"),
-        "riskLimit": float(os.getenv("RISK_LIMIT", 2.0)),
-        "maxDrawdown": float(os.getenv("MAX_DRAWDOWN", 20.0)),
-        "strategyMode": os.getenv("STRATEGY_MODE", "hybrid"),
+        "exchangeType": snapshot["exchange_type"],
+        "exchangeName": snapshot["exchange_name"],
+        "riskLimit": snapshot["risk_limit"],
+        "maxDrawdown": snapshot["max_drawdown"],
+        "strategyMode": snapshot["strategy_mode"],
+        "version": snapshot["version"],
     }
 
+@router.get("/")
+async def get_config():
+    # Served from memory; the store is loaded once at startup
+    return _as_response(config_store.snapshot())
+
 @router.post("/")
 async def save_config(config: BotConfig):
     try:
-        env_file = ".env"
-        # Ensure .env exists
-        if not os.path.exists(env_file):
-            with open(env_file, 'w') as f:
-                f.write("")
-        
-        set_key(env_file, "EXCHANGE_TYPE", config.exchangeType)
-        set_key(env_file, "EXCHANGE_NAME", config.exchangeName)
-        set_key(env_file, "RISK_LIMIT", str(config.riskLimit))
-        set_key(env_file, "MAX_DRAWDOWN", str(config.maxDrawdown))
-        set_key(env_file, "STRATEGY_MODE", config.strategyMode)
-        # Optional: restart bot logic here
-        return {"message": "Config saved successfully"}
+        # One validated, atomic write; bot workers and the calendar pick it up live
+        config_store.update(
+            expected_version=config.version,
+            exchange_type=config.exchangeType,
+            exchange_name=config.exchangeName,
+            risk_limit=config.riskLimit,
+            max_drawdown=config.maxDrawdown,
+            strategy_mode=config.strategyMode,
+        )
+        return {"message": "Config saved successfully", "config": _as_response(config_store.snapshot())}
+    except ConfigConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
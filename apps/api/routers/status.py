@@ -1,17 +1,13 @@
-from fastapi import APIRouter
-from utils.market_calendar import is_trading_day
-import psutil
+from fastapi import APIRouter, Depends, Request, Response
+from utils.status_sampler import StatusSampler, get_status_sampler
 
 router = APIRouter(prefix="/status", tags=["status"])
 
 @router.get("/")
-async def get_status():
-    cpu_usage = psutil.cpu_percent()
-    ram_usage = psutil.virtual_memory().percent
-    
-    return {
-        "botStatus": "running",  # From global state or DB
-        "pnL": 1240.50,  # Mock, from DB
-        "marketOpen": is_trading_day(),
-        "systemHealth": {"cpu": cpu_usage, "ram": ram_usage}, 
-    }
+async def get_status(request: Request, sampler: StatusSampler = Depends(get_status_sampler)):
+    # Served from the sampler's latest snapshot; pollers can revalidate with If-None-Match
+    snapshot = await sampler.current()
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == snapshot.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
@@ -1,10 +1,9 @@
-from datetime import datetime
+from src.python.utils.market_calendar import CalendarService, calendar_service
 
-def is_trading_day():
+
+def get_calendar_service() -> CalendarService:
     """
-    Checks if today is a trading day.
-    This is a mock implementation. In minimal viable product, crypto is 24/7.
-    If stocks, we would check weekends/holidays.
+    FastAPI dependency: the process-wide calendar service.
+    Warmed at startup (see main.lifespan), so lookups are served from memory.
     """
-    # Crypto markets are always open
-    return True
+    return calendar_service
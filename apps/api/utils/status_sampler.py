@@ -0,0 +1,97 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
+
+import psutil
+
+from src.python.utils.market_calendar import CalendarService, calendar_service
+from src.python.utils.bot_supervisor import BotSupervisor, bot_supervisor
+from ws.manager import ConnectionManager, manager
+
+logger = logging.getLogger(__name__)
+
+STATUS_SAMPLE_INTERVAL = float(os.getenv("STATUS_SAMPLE_INTERVAL", 2))  # seconds
+
+
+class StatusSnapshot(NamedTuple):
+    """Immutable /status payload with its serialized body and ETag."""
+    payload: Mapping
+    body: bytes
+    etag: str
+    version: int
+    sampled_at: float
+
+
+class StatusSampler:
+    """
+    Refreshes system, market and bot state every STATUS_SAMPLE_INTERVAL into
+    an immutable snapshot. Requests read `snapshot` (one attribute load); a
+    changed snapshot is also pushed on the `status` WebSocket channel.
+    """
+
+    def __init__(self, calendar: CalendarService, supervisor: BotSupervisor, ws: ConnectionManager,
+                 interval: float = STATUS_SAMPLE_INTERVAL):
+        self.calendar = calendar
+        self.supervisor = supervisor
+        self.ws = ws
+        self.interval = interval
+        self.snapshot: Optional[StatusSnapshot] = None
+        self._task: Optional[asyncio.Task] = None
+        psutil.cpu_percent()  # prime: later non-blocking calls measure since the previous one
+
+    async def _collect(self) -> dict:
+        workers = self.supervisor.status()
+        return {
+            "botStatus": "running" if self.supervisor.running else "stopped",
+            "workers": {"alive": sum(w["alive"] for w in workers), "total": len(workers)},
+            "pnL": None,  # no PnL source is wired up yet; clients get it from the `pnl` channel
+            "marketOpen": await self.calendar.is_trading_day(),
+            "systemHealth": {"cpu": psutil.cpu_percent(), "ram": psutil.virtual_memory().percent},
+        }
+
+    async def sample(self) -> StatusSnapshot:
+        """Takes one sample; the snapshot (and its ETag) only changes when the payload does."""
+        payload = await self._collect()
+        body = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode()
+        if self.snapshot is not None and body == self.snapshot.body:
+            return self.snapshot
+        version = self.snapshot.version + 1 if self.snapshot else 1
+        etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+        self.snapshot = StatusSnapshot(MappingProxyType(payload), body, etag, version, time.time())
+        await self.ws.broadcast({"type": "status", **payload}, channel="status")
+        return self.snapshot
+
+    async def current(self) -> StatusSnapshot:
+        # Only before the first tick (or without the lifespan, e.g. in scripts)
+        return self.snapshot or await self.sample()
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sample()
+            except Exception as e:
+                logger.error(f"Status sample failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+# Global sampler instance
+status_sampler = StatusSampler(calendar_service, bot_supervisor, manager)
+
+
+def get_status_sampler() -> StatusSampler:
+    """FastAPI dependency: the process-wide status sampler (started in main.lifespan)."""
+    return status_sampler
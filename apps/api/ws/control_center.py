@@ -1,15 +1,80 @@
+import json
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from .manager import manager
+from .manager import manager, KNOWN_CHANNELS, WS_BATCH_INTERVAL
+from utils.status_sampler import status_sampler
 
 router = APIRouter()
 
+MAX_BATCH_INTERVAL = 5.0  # seconds
+
+
+def parse_batch_interval(raw) -> float:
+    """?batch_ms as seconds, clamped to [0, MAX_BATCH_INTERVAL] (0 = no batching); WS_BATCH_INTERVAL if invalid."""
+    try:
+        value = float(raw) / 1000
+    except (TypeError, ValueError):
+        return WS_BATCH_INTERVAL
+    if value != value:  # NaN
+        return WS_BATCH_INTERVAL
+    return min(max(value, 0.0), MAX_BATCH_INTERVAL)
+
+
+def _as_list(cmd: dict, plural: str, singular: str):
+    values = cmd.get(plural) or ([cmd[singular]] if cmd.get(singular) else [])
+    return [str(v) for v in values]
+
+
+async def handle_command(websocket: WebSocket, data: str):
+    """
+    Subscription protocol:
+      {"action": "subscribe", "channel": "ticks", "symbols": ["BTC/USDT"]}
+      {"action": "unsubscribe", "channel": "ticks", "symbol": "BTC/USDT"}
+      {"action": "subscribe", "channel": "trades", "strategies": ["momentum"]}
+      {"action": "list"}
+    Without symbols/strategies a subscribe covers the whole channel.
+    Anything else is echoed back as before.
+    """
+    try:
+        cmd = json.loads(data)
+    except ValueError:
+        cmd = None
+    if not isinstance(cmd, dict) or "action" not in cmd:
+        await manager.send_personal({"type": "echo", "data": data}, websocket)
+        return
+
+    action = cmd["action"]
+    if action in ("subscribe", "unsubscribe"):
+        channel = cmd.get("channel")
+        if channel not in KNOWN_CHANNELS:
+            await manager.send_personal({"type": "error", "error": f"Unknown channel: {channel}"}, websocket)
+            return
+        handler = manager.subscribe if action == "subscribe" else manager.unsubscribe
+        topics = handler(websocket, channel, _as_list(cmd, "symbols", "symbol"),
+                         _as_list(cmd, "strategies", "strategy"))
+        await manager.send_personal({"type": f"{action}d", "channel": channel, "topics": topics}, websocket)
+    elif action == "list":
+        await manager.send_personal({"type": "subscriptions", "topics": manager.subscriptions(websocket)}, websocket)
+    else:
+        await manager.send_personal({"type": "error", "error": f"Unknown action: {action}"}, websocket)
+
+
 @router.websocket("/ws/control-center")
 async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket, channel="all")
+    # Negotiation: ?encoding=msgpack for binary frames, ?batch_ms=50 to receive batched arrays,
+    # ?channels=pnl,status to start with fewer channels than "all"
+    params = websocket.query_params
+    batch_interval = parse_batch_interval(params.get("batch_ms"))
+    channels = [ch for ch in params.get("channels", "").split(",") if ch]
+    await manager.connect(websocket, channel="all" if not channels else channels[0],
+                          encoding=params.get("encoding", "json"), batch_interval=batch_interval)
+    for ch in channels[1:]:
+        manager.subscribe(websocket, ch)
+    # Current status right away; later changes arrive on the `status` channel
+    if status_sampler.snapshot is not None and "status" in manager.subscriptions(websocket):
+        await manager.send_personal({"type": "status", **status_sampler.snapshot.payload}, websocket)
     try:
         while True:
-            data = await websocket.receive_text()  # Optional: client can send commands
-            # Future: handle commands like "subscribe:alerts"
-            await manager.send_personal({"type": "echo", "data": data}, websocket)
+            data = await websocket.receive_text()  # Client commands (subscription protocol)
+            await handle_command(websocket, data)
     except WebSocketDisconnect:
         manager.disconnect(websocket, channel="all")
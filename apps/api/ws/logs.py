@@ -1,17 +1,56 @@
-from fastapi import APIRouter, WebSocket
 import asyncio
+import logging
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from src.python.utils.log_bus import CATEGORIES, log_bus
+from .manager import manager, WS_BATCH_INTERVAL
 
 router = APIRouter(prefix="/ws", tags=["websocket"])
 
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+LOG_PUMP_INTERVAL = 0.05  # seconds between bus drains
+DEFAULT_REPLAY = 100
+logger = logging.getLogger(__name__)
+
+
+def log_topic(category: str, level: str) -> str:
+    return f"logs:{category}:{level}"
+
+
+async def pump_logs():
+    """Background task: drains the log bus and fans entries out on the 'logs' channel."""
+    while True:
+        for entry in log_bus.drain():
+            try:
+                # Channel-wide subscribers (control center) plus the matching filtered topic
+                await manager.broadcast(entry, "logs", topic=log_topic(entry["category"], entry["level"]))
+            except Exception:
+                # One bad entry or failed send must not end log streaming for the process
+                logger.exception("Log pump failed to broadcast an entry")
+        await asyncio.sleep(LOG_PUMP_INTERVAL)
+
+
 @router.websocket("/logs")
 async def websocket_logs(websocket: WebSocket):
-    await websocket.accept()
+    # Server-side filters: ?level=WARNING&categories=ai,calendar&replay=200
+    params = websocket.query_params
+    min_level = params.get("level", "INFO").upper()
+    if min_level not in LEVELS:
+        min_level = "INFO"
+    categories = [c for c in params.get("categories", "").split(",") if c in CATEGORIES] or list(CATEGORIES)
+    try:
+        replay = min(max(int(params.get("replay", DEFAULT_REPLAY)), 0), log_bus.buffer.maxlen)
+    except ValueError:
+        replay = DEFAULT_REPLAY
+    levels = LEVELS[LEVELS.index(min_level):]
+
+    await manager.connect(websocket, channel=None, encoding=params.get("encoding", "json"),
+                          batch_interval=WS_BATCH_INTERVAL)
+    # Replay and subscribe without yielding in between, so nothing is missed or duplicated
+    for entry in log_bus.recent(replay, logging.getLevelName(min_level), categories):
+        await manager.send_personal(entry, websocket)
+    manager.subscribe(websocket, "logs", topics=[log_topic(c, lvl) for c in categories for lvl in levels])
     try:
         while True:
-            # Simulate log stream (from queue or file tail)
-            # In a real scenario, this would subscribe to a log queue
-            await websocket.send_text("Log: New trade executed")
-            await asyncio.sleep(1)
-    except Exception:
-        # Client likely disconnected
-        await websocket.close()
+            await websocket.receive_text()  # keeps the connection open; input is ignored
+    except WebSocketDisconnect:
+        manager.disconnect(websocket, channel="all")
@@ -1,62 +1,368 @@
+import os
 import json
+from collections import deque
+from enum import Enum
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, List, Set
+from typing import Deque, Dict, List, Optional, Set, Tuple, Union
 import logging
 import asyncio
+from src.python.utils.ws_backplane import Backplane, WS_BACKPLANE_URL, create_backplane, make_envelope
+
+try:
+    import msgpack
+except ImportError:  # binary encoding is optional
+    msgpack = None
 
 logger = logging.getLogger(__name__)
 
+JSON = "json"
+MSGPACK = "msgpack"
+
+
+class OverflowPolicy(str, Enum):
+    """What to do when a client's outbound queue is full."""
+    DROP_OLDEST = "drop_oldest"  # discard the oldest queued frame
+    CONFLATE = "conflate"        # keep only the latest frame of that channel
+    DISCONNECT = "disconnect"    # kick the slow client
+
+
+WS_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", 256))
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", 5))
+WS_OVERFLOW_POLICY = OverflowPolicy(os.getenv("WS_OVERFLOW_POLICY", OverflowPolicy.DROP_OLDEST.value))
+WS_BATCH_INTERVAL = float(os.getenv("WS_BATCH_INTERVAL", 0))  # seconds; 0 = one frame per message
+WS_MAX_BATCH = int(os.getenv("WS_MAX_BATCH", 500))
+WS_MAX_TOPICS = int(os.getenv("WS_MAX_TOPICS", 1000))
+
+# "all" subscribes to the default channels; per-symbol feeds are opt-in
+DEFAULT_CHANNELS = ("logs", "pnl", "status")
+KNOWN_CHANNELS = DEFAULT_CHANNELS + ("ticks", "trades", "alerts")
+
+# State channels only need the latest value; streams keep as much as fits
+CHANNEL_POLICIES: Dict[str, OverflowPolicy] = {
+    "pnl": OverflowPolicy.CONFLATE,
+    "status": OverflowPolicy.CONFLATE,
+    "logs": OverflowPolicy.DROP_OLDEST,
+}
+
+
+def topic_key(channel: str, symbol: Optional[str] = None, strategy: Optional[str] = None) -> str:
+    """Index key for a channel, optionally narrowed to one symbol or strategy."""
+    if symbol:
+        return f"{channel}:symbol:{symbol.upper()}"
+    if strategy:
+        return f"{channel}:strategy:{strategy}"
+    return channel
+
+
+def negotiate_encoding(requested: Optional[str]) -> str:
+    """Client-requested wire encoding, falling back to JSON if msgpack is unavailable."""
+    if requested == MSGPACK and msgpack is not None:
+        return MSGPACK
+    return JSON
+
+
+class Frame:
+    """A message encoded at most once per wire encoding, shared by every recipient."""
+    __slots__ = ("message", "_encoded")
+
+    def __init__(self, message: dict):
+        self.message = message
+        self._encoded: Dict[str, Union[str, bytes]] = {}
+
+    def encode(self, encoding: str) -> Union[str, bytes]:
+        data = self._encoded.get(encoding)
+        if data is None:
+            if encoding == MSGPACK:
+                data = msgpack.packb(self.message, default=str)
+            else:
+                data = json.dumps(self.message, default=str)
+            self._encoded[encoding] = data
+        return data
+
+
+def pack_batch(encoded: List[Union[str, bytes]], encoding: str) -> Union[str, bytes]:
+    """Joins pre-encoded frames into one array frame without re-serializing them."""
+    if encoding == MSGPACK:
+        n = len(encoded)
+        if n < 16:
+            header = bytes([0x90 | n])
+        elif n < 65536:
+            header = b"\xdc" + n.to_bytes(2, "big")
+        else:
+            header = b"\xdd" + n.to_bytes(4, "big")
+        return header + b"".join(encoded)
+    return "[" + ",".join(encoded) + "]"
+
+
+class ClientConnection:
+    """
+    One socket with its own bounded outbound queue and writer task, so a slow
+    client only ever delays itself. With a batch interval, everything queued
+    during the interval goes out as a single array frame.
+    """
+
+    def __init__(self, websocket: WebSocket, manager: "ConnectionManager", max_queue: int = WS_QUEUE_SIZE,
+                 encoding: str = JSON, batch_interval: float = WS_BATCH_INTERVAL):
+        self.websocket = websocket
+        self.manager = manager
+        self.max_queue = max_queue
+        self.encoding = encoding
+        self.batch_interval = batch_interval
+        self.queue: Deque[Tuple[str, Frame]] = deque()  # (channel, frame)
+        self.topics: Set[str] = set()  # channel names and filtered topic keys
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.task = asyncio.create_task(self._writer())
+
+    def enqueue(self, frame: Frame, channel: str) -> bool:
+        """Queues a frame without touching the network; False if the client was dropped."""
+        if self.closed:
+            return False
+        if len(self.queue) >= self.max_queue:
+            policy = CHANNEL_POLICIES.get(channel, WS_OVERFLOW_POLICY)
+            if policy == OverflowPolicy.DISCONNECT:
+                logger.warning("Slow WebSocket client exceeded its queue, disconnecting")
+                self.manager.disconnect(self.websocket)
+                asyncio.create_task(self._close(code=1013))
+                return False
+            if policy == OverflowPolicy.CONFLATE:
+                before = len(self.queue)
+                self.queue = deque(item for item in self.queue if item[0] != channel)
+                self.dropped += before - len(self.queue)
+            if len(self.queue) >= self.max_queue:
+                self.queue.popleft()
+                self.dropped += 1
+        self.queue.append((channel, frame))
+        self.ready.set()
+        return True
+
+    async def _send(self, data: Union[str, bytes]):
+        # asyncio.wait (not wait_for) so a cancel during shutdown is never swallowed
+        if isinstance(data, bytes):
+            send = asyncio.ensure_future(self.websocket.send_bytes(data))
+        else:
+            send = asyncio.ensure_future(self.websocket.send_text(data))
+        try:
+            done, _ = await asyncio.wait({send}, timeout=WS_SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            send.cancel()
+            raise
+        if not done:
+            send.cancel()
+            raise asyncio.TimeoutError()
+        send.result()
+
+    async def _writer(self):
+        try:
+            while not self.closed:
+                await self.ready.wait()
+                if self.batch_interval > 0:
+                    await asyncio.sleep(self.batch_interval)  # let the batch fill up
+                self.ready.clear()
+                while self.queue and not self.closed:
+                    if self.batch_interval > 0:
+                        count = min(len(self.queue), WS_MAX_BATCH)
+                        batch = [self.queue.popleft()[1].encode(self.encoding) for _ in range(count)]
+                        await self._send(pack_batch(batch, self.encoding))
+                        self.sent += count
+                    else:
+                        _, frame = self.queue.popleft()
+                        await self._send(frame.encode(self.encoding))
+                        self.sent += 1
+        except (WebSocketDisconnect, RuntimeError, asyncio.TimeoutError) as e:
+            logger.info(f"WebSocket writer stopped: {type(e).__name__}")
+            self.manager.disconnect(self.websocket)
+        except Exception as e:
+            logger.error(f"Error sending message to {self.websocket}: {e}")
+            self.manager.disconnect(self.websocket)
+
+    async def _close(self, code: int = 1000):
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+    def stop(self):
+        self.closed = True
+        self.queue.clear()
+        self.ready.set()
+        if self.task and not self.task.done() and self.task is not asyncio.current_task():
+            self.task.cancel()
+
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Set[WebSocket] = set()  # All clients
-        self.channels: Dict[str, Set[WebSocket]] = {
-            "logs": set(),
-            "pnl": set(),
-            "status": set(),
-            # Future: "alerts": set(), "trades": set() – add easily
-        }
-
-    async def connect(self, websocket: WebSocket, channel: str = "all"):
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        # Channel-wide subscribers ("all" covers only DEFAULT_CHANNELS)
+        self.channels: Dict[str, Set[WebSocket]] = {ch: set() for ch in KNOWN_CHANNELS}
+        # Filtered subscribers, e.g. "ticks:symbol:BTC/USDT" -> sockets
+        self.topics: Dict[str, Set[WebSocket]] = {}
+        # Optional cross-worker fan-out; None = this process only
+        self.backplane: Optional[Backplane] = None
+
+    async def start_backplane(self, url: Optional[str] = WS_BACKPLANE_URL):
+        """Joins the shared backplane (WS_BACKPLANE_URL) so broadcasts reach every worker."""
+        if url and self.backplane is None:
+            self.backplane = create_backplane(url, on_message=self.deliver_remote)
+            await self.backplane.start()
+            logger.info(f"WebSocket backplane started as {self.backplane.origin}")
+
+    async def stop_backplane(self):
+        if self.backplane is not None:
+            await self.backplane.stop()
+            self.backplane = None
+
+    async def connect(self, websocket: WebSocket, channel: Optional[str] = "all",
+                      encoding: str = JSON, batch_interval: float = WS_BATCH_INTERVAL):
         await websocket.accept()
         self.active_connections.add(websocket)
-        if channel == "all":
-            for ch in self.channels:
-                self.channels[ch].add(websocket)
-        elif channel in self.channels:
+        if websocket not in self.clients:
+            client = ClientConnection(websocket, self, encoding=negotiate_encoding(encoding),
+                                      batch_interval=batch_interval)
+            self.clients[websocket] = client
+            client.start()
+        # channel=None: connect only, the caller subscribes to specific topics
+        for ch in (DEFAULT_CHANNELS if channel == "all" else [channel] if channel else []):
+            self.subscribe(websocket, ch)
+
+    def subscribe(self, websocket: WebSocket, channel: str, symbols: Optional[List[str]] = None,
+                  strategies: Optional[List[str]] = None, topics: Optional[List[str]] = None) -> List[str]:
+        """
+        Adds channel-wide or filtered subscriptions; returns the topics now held.
+        `topics` are raw topic keys under the channel (e.g. "logs:ai:ERROR").
+        """
+        client = self.clients.get(websocket)
+        if client is None or channel not in self.channels:
+            return []
+        keys = [topic_key(channel, symbol=sym) for sym in symbols or []]
+        keys += [topic_key(channel, strategy=strat) for strat in strategies or []]
+        keys += [key for key in topics or [] if key.startswith(f"{channel}:")]
+        if not keys:
             self.channels[channel].add(websocket)
+            client.topics.add(channel)
+            return [channel]
+        added = []
+        for key in keys:
+            if len(client.topics) >= WS_MAX_TOPICS:
+                logger.warning("WebSocket client hit the topic limit")
+                break
+            self.topics.setdefault(key, set()).add(websocket)
+            client.topics.add(key)
+            added.append(key)
+        return added
+
+    def unsubscribe(self, websocket: WebSocket, channel: str, symbols: Optional[List[str]] = None,
+                    strategies: Optional[List[str]] = None) -> List[str]:
+        """Removes subscriptions; without filters drops the whole channel incl. its filters."""
+        client = self.clients.get(websocket)
+        if client is None:
+            return []
+        if symbols or strategies:
+            keys = [topic_key(channel, symbol=sym) for sym in symbols or []]
+            keys += [topic_key(channel, strategy=strat) for strat in strategies or []]
+        else:
+            keys = [channel] + [t for t in client.topics if t.startswith(f"{channel}:")]
+        removed = []
+        for key in keys:
+            subs = self.channels.get(key) if key in self.channels else self.topics.get(key)
+            if subs is not None and websocket in subs:
+                subs.discard(websocket)
+                if key not in self.channels and not subs:
+                    del self.topics[key]  # keep the index small as topics come and go
+                removed.append(key)
+            client.topics.discard(key)
+        return removed
+
+    def subscriptions(self, websocket: WebSocket) -> List[str]:
+        client = self.clients.get(websocket)
+        return sorted(client.topics) if client else []
 
     def disconnect(self, websocket: WebSocket, channel: str = "all"):
+        client = self.clients.get(websocket)
+        if channel != "all" and client is not None:
+            self.unsubscribe(websocket, channel)
+            if client.topics:
+                return
+
+        # Fully gone: leave every channel and topic
+        if client is not None:
+            for key in list(client.topics):
+                subs = self.channels.get(key) if key in self.channels else self.topics.get(key)
+                if subs is not None:
+                    subs.discard(websocket)
+                    if key not in self.channels and not subs:
+                        del self.topics[key]
         self.active_connections.discard(websocket)
-        if channel == "all":
-            for ch in self.channels:
-                self.channels[ch].discard(websocket)
-        elif channel in self.channels:
-            self.channels[channel].discard(websocket)
-
-    async def broadcast(self, message: dict, channel: str = "logs"):
-        """Broadcast to specific channel or all"""
-        data = json.dumps(message)
-        disconnected = set()
-        targets = self.channels.get(channel, self.active_connections)
-        for connection in targets:
-            try:
-                await connection.send_text(data)
-            except WebSocketDisconnect:
-                disconnected.add(connection)
-            except Exception as e:
-                logger.error(f"Error sending message to {connection}: {e}")
-                disconnected.add(connection)
-        
-        # Clean up disconnected
-        for conn in disconnected:
-            self.disconnect(conn, channel if channel in self.channels else "all")
+        client = self.clients.pop(websocket, None)
+        if client:
+            client.stop()
+
+    async def broadcast(self, message: dict, channel: str = "logs", symbol: Optional[str] = None,
+                        strategy: Optional[str] = None, topic: Optional[str] = None):
+        """
+        Broadcast to specific channel or all. Only enqueues; never awaits the network.
+        The message is encoded once per wire encoding and the bytes are shared.
+        With symbol/strategy it reaches channel-wide subscribers plus matching
+        filtered subscribers only; sockets with no match never see the message.
+        With a backplane the message is also published for the other workers.
+        """
+        self._deliver(message, channel, symbol, strategy, topic)
+        if self.backplane is not None:
+            self.backplane.publish(make_envelope(message, channel, symbol, strategy, topic))
+
+    def deliver_remote(self, envelope: dict):
+        """Backplane callback: local delivery of a message published elsewhere."""
+        self._deliver(envelope["message"], envelope.get("channel", "logs"), envelope.get("symbol"),
+                      envelope.get("strategy"), envelope.get("topic"))
+
+    def _deliver(self, message: dict, channel: str, symbol: Optional[str],
+                 strategy: Optional[str], topic: Optional[str]):
+        if channel not in self.channels:
+            groups = [self.active_connections]
+        else:
+            groups = [self.channels[channel]]
+            if symbol:
+                groups.append(self.topics.get(topic_key(channel, symbol=symbol), ()))
+            if strategy:
+                groups.append(self.topics.get(topic_key(channel, strategy=strategy), ()))
+            if topic:
+                groups.append(self.topics.get(topic, ()))
+
+        frame = Frame(message)
+        seen: Set[WebSocket] = set()
+        for group in groups:
+            for connection in list(group):
+                if connection in seen:
+                    continue
+                seen.add(connection)
+                client = self.clients.get(connection)
+                if client:
+                    client.enqueue(frame, channel)
 
     async def send_personal(self, message: dict, websocket: WebSocket):
-        try:
-            await websocket.send_text(json.dumps(message))
-        except RuntimeError:
-            # WebSocket might be closed already
-            pass
+        client = self.clients.get(websocket)
+        if client:
+            client.enqueue(Frame(message), "personal")
+
+    def backplane_stats(self) -> Optional[dict]:
+        if self.backplane is None:
+            return None
+        return {"origin": self.backplane.origin, "last_id": self.backplane.last_id,
+                "outbox": len(self.backplane._outbox), **self.backplane.counters}
+
+    def stats(self) -> List[dict]:
+        """Per-client queue depth and delivery counters."""
+        return [
+            {"encoding": c.encoding, "topics": len(c.topics), "queued": len(c.queue),
+             "sent": c.sent, "dropped": c.dropped}
+            for c in self.clients.values()
+        ]
 
 # Global manager instance
 manager = ConnectionManager()
@@ -39,3 +39,17 @@ try:
     print("✅ Visualization Library Loaded Successfully! Chart saved to test_chart.png")
 except Exception as e:
     print(f"❌ Chart Error: {e}")
+
+# 3. Bar Store (memory-mapped columns; backfill with OHLCVBackfill + BarStoreSink)
+print("🗄️ Checking Bar Store...")
+try:
+    from src.python.data.bar_store import BarStore
+    store = BarStore()
+    for symbol in store.symbols():
+        for timeframe in store.timeframes(symbol):
+            bars = store.read(symbol, timeframe)
+            print(f"✅ {symbol} {timeframe}: {len(bars)} bars in {len(bars.chunks)} partitions")
+    if not store.symbols():
+        print("ℹ️ Bar store is empty (run a backfill first)")
+except Exception as e:
+    print(f"❌ Bar Store Error: {e}")
@@ -0,0 +1,12 @@
+#!/usr/bin/env sh
+# Pre-start warmup: loads .env and the runtime config, imports the heavy
+# dependencies, builds the calendar indexes (and publishes them to the Redis
+# tier so API workers load instead of rebuilding), then prints a per-phase
+# timing report. Exits non-zero if a phase failed.
+#
+#   scripts/warmup.sh                                  # warm caches only
+#   scripts/warmup.sh --exchanges NYSE,Binance         # index several exchanges
+#   scripts/warmup.sh --wait-api http://localhost:8000/api/v1/ready
+set -e
+cd "$(dirname "$0")/.."
+exec python -m src.python.utils.startup "$@"
@@ -0,0 +1,122 @@
+"""
+Offline latency benchmark for the AI layer.
+
+Drives HybridBrain backed by MockProvider with concurrent, skewed load (a few
+hot headlines, a long tail of unique ones) and reports p50/p99 latency,
+throughput, cache hit ratio and API-call count. No keys or network needed:
+
+    python -m src.python.ai.benchmark --requests 2000 --concurrency 50 --batch-size 20
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+from src.python.ai.core.response_cache import ResponseCache
+from src.python.ai.providers.mock_provider import MockProvider
+from src.python.ai.hybrid_brain import HybridBrain
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def build_workload(requests: int, unique_texts: int, decision_share: float, seed: int) -> list:
+    """Deterministic request mix: ('sentiment', text) or ('decision', context)."""
+    rng = random.Random(seed)
+    workload = []
+    for _ in range(requests):
+        if rng.random() < decision_share:
+            workload.append(("decision", {"symbol": rng.choice(["BTC/USDT", "ETH/USDT", "SOL/USDT"]),
+                                          "trend": rng.choice(["up", "down", "flat"])}))
+        else:
+            # Pareto-skewed popularity: hot headlines repeat, the tail is mostly unique
+            rank = min(unique_texts - 1, int(rng.paretovariate(1.2)) - 1)
+            workload.append(("sentiment", f"Headline #{rank}: market moves on news item {rank}"))
+    return workload
+
+
+async def run_benchmark(requests: int = 2000, concurrency: int = 50, unique_texts: int = 500,
+                        batch_size: int = 0, decision_share: float = 0.2, latency: float = 0.05,
+                        jitter: float = 0.02, error_rate: float = 0.01, seed: int = 7) -> dict:
+    provider = MockProvider(latency=latency, jitter=jitter, error_rate=error_rate, seed=seed,
+                            cache=ResponseCache(redis_url=None))
+    brain = HybridBrain(roles={"scout": provider, "strategist": provider,
+                               "validator": provider, "risk_officer": provider})
+    workload = build_workload(requests, unique_texts, decision_share, seed)
+
+    # Group sentiment requests into batch calls when batching is enabled
+    units = []
+    if batch_size > 0:
+        texts = [payload for kind, payload in workload if kind == "sentiment"]
+        units += [("batch", texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        units += [item for item in workload if item[0] == "decision"]
+        random.Random(seed).shuffle(units)
+    else:
+        units = workload
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def _one(kind, payload):
+        async with semaphore:
+            start = time.perf_counter()
+            if kind == "sentiment":
+                await brain.get_market_sentiment(payload)
+            elif kind == "batch":
+                await brain.get_market_sentiment_batch(payload)
+            else:
+                await brain.get_final_decision(payload)
+            elapsed = (time.perf_counter() - start) * 1000
+            # A batch answers len(payload) requests at the same latency
+            latencies.extend([elapsed] * (len(payload) if kind == "batch" else 1))
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*[_one(kind, payload) for kind, payload in units])
+    wall = time.perf_counter() - wall_start
+    await brain.close()
+
+    latencies.sort()
+    stats = provider.cache_stats()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "batch_size": batch_size,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "throughput_rps": round(requests / wall, 1),
+        "cache_hit_ratio": round(stats["hit_ratio"], 3),
+        "api_calls": provider.api_calls,
+        "api_errors": provider.errors,
+        "wall_s": round(wall, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline HybridBrain latency benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--unique-texts", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=0)
+    parser.add_argument("--decision-share", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock API latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(
+        requests=args.requests, concurrency=args.concurrency, unique_texts=args.unique_texts,
+        batch_size=args.batch_size, decision_share=args.decision_share, latency=args.latency,
+        jitter=args.jitter, error_rate=args.error_rate, seed=args.seed,
+    ))
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print("\n📊 AI Layer Benchmark")
+        for key, value in report.items():
+            print(f"  {key:>16}: {value}")
@@ -1,10 +1,183 @@
+import os
+import json
+import asyncio
+import logging
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from src.python.ai.core.response_cache import MISSING, ResponseCache, get_response_cache, stable_key
+
+logger = logging.getLogger(__name__)
+
+# Shared, bounded worker pool for SDKs that only offer blocking calls
+AI_MAX_WORKERS = int(os.getenv("AI_MAX_WORKERS", 4))
+_executor: Optional[ThreadPoolExecutor] = None
+
+# Batch packing limits (rough token estimate: ~4 characters per token)
+AI_BATCH_TOKEN_BUDGET = int(os.getenv("AI_BATCH_TOKEN_BUDGET", 3000))
+AI_BATCH_MAX_ITEMS = int(os.getenv("AI_BATCH_MAX_ITEMS", 50))
+
+NEUTRAL_SENTIMENT = {"score": 0.0, "label": "Neutral"}
+
+
+def get_ai_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=AI_MAX_WORKERS, thread_name_prefix="ai-provider")
+    return _executor
+
 
 class BaseAIProvider(ABC):
     """
     Base Interface for all AI Models (Gemini, DeepSeek, GPT, etc.)
     Every provider must implement these methods.
     """
+
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        # In-flight calls by cache key (single-flight coalescing)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Response cache shared by all providers; keys are namespaced per provider class
+        self.cache = cache or get_response_cache()
+        self.cache_namespace = type(self).__name__
+
+    async def _run_blocking(self, func: Callable[..., Any], *args) -> Any:
+        """Runs a blocking SDK call on the shared AI worker pool, off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_ai_executor(), func, *args)
+
+    async def _single_flight(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Concurrent callers with the same key share one in-flight API call."""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(call())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _cached_call(self, kind: str, payload: Any, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Cache-through API call: stable content key, shared LRU/TTL cache, and
+        single-flight so a cold key is fetched once however many callers wait.
+        Failures propagate and are not cached.
+        """
+        key = stable_key(f"{self.cache_namespace}:{kind}", payload)
+        cached = await self.cache.get(key)
+        if cached is not MISSING:
+            return cached
+
+        async def _fetch():
+            result = await call()
+            await self.cache.set(key, result)
+            return result
+
+        return await self._single_flight(key, _fetch)
+
+    async def _complete(self, prompt: str) -> str:
+        """Raw text completion. Providers that implement it get true batching."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _parse_json(text: str) -> Any:
+        return json.loads(text.replace('```json', '').replace('```', '').strip())
+
+    @staticmethod
+    def _pack_batches(texts: List[str]) -> List[List[str]]:
+        """Greedy packing of texts into chunks that fit the token budget."""
+        batches, current, tokens = [], [], 0
+        for text in texts:
+            cost = len(text) // 4 + 8  # item text + numbering/JSON overhead
+            if current and (tokens + cost > AI_BATCH_TOKEN_BUDGET or len(current) >= AI_BATCH_MAX_ITEMS):
+                batches.append(current)
+                current, tokens = [], 0
+            current.append(text)
+            tokens += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _sentiment_batch_call(self, texts: List[str]) -> Dict[str, dict]:
+        items = "\n".join(f"{i}. {json.dumps(text)}" for i, text in enumerate(texts))
+        prompt = f"""
+        Analyze the sentiment of each numbered crypto news/tweet below.
+        {items}
+        Return ONLY a JSON array with one object per item: {{"id": int, "score": float -1.0 to 1.0, "label": "Positive/Negative/Neutral"}}.
+        """
+        parsed = self._parse_json(await self._complete(prompt))
+        results = {}
+        for entry in parsed:
+            idx = int(entry.get("id", -1))
+            if 0 <= idx < len(texts):
+                results[texts[idx]] = {"score": float(entry["score"]), "label": str(entry["label"])}
+        return results
+
+    async def analyze_sentiment_batch(self, texts: List[str]) -> List[dict]:
+        """
+        Scores many texts with one API call per token-budget chunk instead of one per text.
+        Duplicates and cached texts are never sent; items missing from a batch
+        response fall back to single analyze_sentiment calls.
+        """
+        unique = list(dict.fromkeys(texts))
+        results: Dict[str, dict] = {}
+        pending = []
+        for text in unique:
+            cached = await self.cache.get(stable_key(f"{self.cache_namespace}:sentiment", text))
+            if cached is MISSING:
+                pending.append(text)
+            else:
+                results[text] = cached
+
+        async def _run(batch: List[str]) -> Dict[str, dict]:
+            scored: Dict[str, dict] = {}
+            if len(batch) > 1:  # a single item is cheaper through analyze_sentiment
+                try:
+                    scored = await self._sentiment_batch_call(batch)
+                except NotImplementedError:
+                    pass
+                except Exception as e:
+                    logger.warning(f"[BATCH ERROR] {self.get_name()}: {e}")
+            for text, value in scored.items():
+                await self.cache.set(stable_key(f"{self.cache_namespace}:sentiment", text), value)
+            missing = [text for text in batch if text not in scored]
+            if missing:
+                # One failing item must not sink the rest of the batch
+                singles = await asyncio.gather(*[self.analyze_sentiment(text) for text in missing],
+                                               return_exceptions=True)
+                for text, value in zip(missing, singles):
+                    if isinstance(value, Exception):
+                        logger.warning(f"[SENTIMENT ERROR] {self.get_name()}: {value}")
+                        value = dict(NEUTRAL_SENTIMENT)
+                    scored[text] = value
+            return scored
+
+        for scored in await asyncio.gather(*[_run(batch) for batch in self._pack_batches(pending)]):
+            results.update(scored)
+        return [results.get(text, dict(NEUTRAL_SENTIMENT)) for text in texts]
+
+    async def validate_decision(self, decision: str, analysis_data: dict) -> dict:
+        """
+        Second opinion on another model's decision for the same inputs:
+        {"agree": bool, "reason": str}. Failures propagate so the caller can
+        fall back to an earlier answer.
+        """
+        prompt = f"""
+        Act as a Trade Validator. Another analyst looked at this data: {analysis_data}
+        and decided: {decision}. Do you agree with that decision?
+        Return ONLY JSON: {{"agree": true/false, "reason": "..."}}
+        """
+
+        async def _call():
+            parsed = self._parse_json(await self._complete(prompt))
+            return {"agree": bool(parsed["agree"]), "reason": str(parsed.get("reason", ""))}
+
+        return await self._cached_call("validation", {"decision": decision, "data": analysis_data}, _call)
+
+    def cache_stats(self) -> dict:
+        """Hit/miss/eviction counters of the response cache."""
+        return self.cache.stats
+
+    async def close(self):
+        """Releases network sessions. Providers holding pooled clients override this."""
+        pass
     
     @abstractmethod
     def get_name(self) -> str:
@@ -23,10 +196,10 @@ class BaseAIProvider(ABC):
 
     @abstractmethod
     async def check_risk(self, portfolio_context: dict) -> dict:
-        """Evaluates risk based on portfolio size and market conditions."""
+        """Evaluates risk based on portfolio size and market conditions. Failures propagate."""
         pass
 
     @abstractmethod
     async def make_decision(self, analysis_data: dict) -> str:
-        """Final decision maker: Returns BUY, SELL, or HOLD."""
+        """Final decision maker: Returns BUY, SELL, or HOLD. Failures propagate."""
         pass
@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from src.python.utils.db_pools import pools
+
+logger = logging.getLogger(__name__)
+
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", 2048))
+AI_CACHE_TTL = float(os.getenv("AI_CACHE_TTL", 25 * 60))  # 25 minutes in seconds
+AI_CACHE_REDIS_URL = os.getenv("AI_CACHE_REDIS_URL")  # optional shared tier
+
+MISSING = object()
+
+
+def stable_key(namespace: str, payload: Any) -> str:
+    """
+    Process-independent cache key: blake2b of the canonical JSON form of the payload.
+    Unlike hash(), the same prompt maps to the same key in every worker and restart.
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+class ResponseCache:
+    """
+    Bounded LRU + TTL cache for AI responses, with an optional Redis tier so
+    several workers share hits. Values must be JSON-serializable.
+    """
+
+    def __init__(self, max_entries: int = AI_CACHE_MAX_ENTRIES, ttl: float = AI_CACHE_TTL,
+                 redis_url: Optional[str] = AI_CACHE_REDIS_URL, prefix: str = "ai_cache"):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.redis_url = redis_url
+        self.prefix = prefix
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()  # key -> (expires_at, value)
+        self._redis = None
+        self._redis_down_until = 0.0
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "remote_hits": 0}
+
+    def _get_redis(self):
+        if not self.redis_url or time.monotonic() < self._redis_down_until:
+            return None
+        # Inside the API, reuse the shared pool (db_pools) when it points at the same
+        # server; bot workers and scripts have no pool and open their own client
+        if pools.redis is not None and pools.redis_url == self.redis_url:
+            return pools.redis
+        if self._redis is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(self.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+        return self._redis
+
+    def _remote_failed(self, e: Exception):
+        # Back off so a dead Redis doesn't add latency to every lookup
+        logger.warning(f"AI cache Redis tier unavailable: {e}")
+        self._redis_down_until = time.monotonic() + 30
+        self._redis = None
+
+    def get_local(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            self.counters["expirations"] += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set_local(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    async def get(self, key: str) -> Any:
+        """Returns the cached value or MISSING (local LRU first, then Redis)."""
+        value = self.get_local(key)
+        if value is not MISSING:
+            self.counters["hits"] += 1
+            return value
+
+        client = self._get_redis()
+        if client is not None:
+            try:
+                raw = await client.get(f"{self.prefix}:{key}")
+                if raw is not None:
+                    value = json.loads(raw)
+                    self.set_local(key, value)
+                    self.counters["hits"] += 1
+                    self.counters["remote_hits"] += 1
+                    return value
+            except Exception as e:
+                self._remote_failed(e)
+
+        self.counters["misses"] += 1
+        return MISSING
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.set_local(key, value, ttl)
+        client = self._get_redis()
+        if client is not None:
+            try:
+                await client.set(f"{self.prefix}:{key}", json.dumps(value, default=str), ex=int(ttl or self.ttl))
+            except Exception as e:
+                self._remote_failed(e)
+
+    def clear(self):
+        self._entries.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "size": len(self._entries),
+            "hit_ratio": self.counters["hits"] / lookups if lookups else 0.0,
+        }
+
+
+_shared_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache shared by all providers (keys are namespaced per provider)."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ResponseCache()
+    return _shared_cache
@@ -1,4 +1,7 @@
 import os
+import time
+import asyncio
+import logging
 # Try to load .env if dotenv is installed, otherwise rely on system env
 try:
     from dotenv import load_dotenv
@@ -6,12 +9,49 @@ try:
 except ImportError:
     pass
 
-from src.python.ai.providers.gemini_provider import GeminiProvider
-from src.python.ai.providers.deepseek_provider import DeepSeekProvider
+logger = logging.getLogger(__name__)
+
+# Per-role latency budgets and the hard upper bound for one decision (seconds)
+ROLE_TIMEOUTS = {
+    "strategist": float(os.getenv("AI_STRATEGIST_TIMEOUT", 8)),
+    "validator": float(os.getenv("AI_VALIDATOR_TIMEOUT", 8)),
+    "risk_officer": float(os.getenv("AI_RISK_TIMEOUT", 8)),
+}
+DECISION_DEADLINE = float(os.getenv("AI_DECISION_DEADLINE", 10))
+# How long a role's last good answer for a symbol may stand in for a failed call
+ROLE_STALE_TTL = float(os.getenv("AI_STALE_TTL", 300))
+
+# Conservative answers used when a role misses its deadline or fails and has
+# no recent good answer to fall back on
+ROLE_DEFAULTS = {
+    "strategist": "HOLD",
+    "validator": None,  # no cross-check available
+    "risk_officer": {"approved": False, "reason": "Risk check unavailable"},
+}
 
 class HybridBrain:
-    def __init__(self):
+    def __init__(self, roles: dict = None):
         print("🧠 Initializing Ultimate Metron Hybrid Brain...")
+
+        if roles is not None:
+            # Injected providers (offline mock mode, benchmarks)
+            self.gemini = None
+            self.deepseek = None
+            self.roles = {"scout": None, "strategist": None, "validator": None,
+                          "risk_officer": None, "backup": None, **roles}
+        else:
+            self._load_default_roles()
+
+        self.last_report = None
+        # Last good answer per (role, symbol): (monotonic time, result)
+        self._last_good = {}
+
+        self._log_role_assignments()
+
+    def _load_default_roles(self):
+        # Imported here so mock mode works without the Gemini SDK installed
+        from src.python.ai.providers.gemini_provider import GeminiProvider
+        from src.python.ai.providers.deepseek_provider import DeepSeekProvider
         
         # 1. Load Providers
         self.gemini = GeminiProvider()
@@ -43,8 +83,6 @@ class HybridBrain:
             "backup": None 
         }
 
-        self._log_role_assignments()
-
     def _log_role_assignments(self):
         print("\n📋 AI Role Assignments:")
         for role, provider in self.roles.items():
@@ -58,24 +96,130 @@ class HybridBrain:
         """Uses the 'SCOUT' role"""
         return await self.roles['scout'].analyze_sentiment(news_text)
 
+    async def get_market_sentiment_batch(self, texts: list):
+        """Uses the 'SCOUT' role; packs many feed items into few API calls"""
+        return await self.roles['scout'].analyze_sentiment_batch(texts)
+
     async def analyze_chart_pattern(self, ohlcv_data: list):
         """Uses the 'STRATEGIST' role"""
         return await self.roles['strategist'].analyze_pattern(ohlcv_data)
 
     async def validate_trade_risk(self, portfolio_data: dict):
-        """Uses the 'RISK_OFFICER' role"""
-        return await self.roles['risk_officer'].check_risk(portfolio_data)
+        """Uses the 'RISK_OFFICER' role; a failed check rejects"""
+        try:
+            return await self.roles['risk_officer'].check_risk(portfolio_data)
+        except Exception as e:
+            logger.warning(f"risk_officer failed: {e}")
+            return ROLE_DEFAULTS["risk_officer"]
+
+    def _fallback(self, role: str, key, status: str) -> tuple:
+        """Last good answer under `key` if still fresh (status 'stale'), else the role default."""
+        entry = self._last_good.get(key)
+        if entry is not None and time.monotonic() - entry[0] <= ROLE_STALE_TTL:
+            return entry[1], "stale"
+        return ROLE_DEFAULTS[role], status
+
+    async def _run_role(self, role: str, call, key=None) -> tuple:
+        """Runs one role call under its latency budget; returns (result, status, latency_ms)."""
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(call, ROLE_TIMEOUTS[role])
+            status = "ok"
+            if key is not None:
+                self._last_good[key] = (time.monotonic(), result)
+        except asyncio.TimeoutError:
+            result, status = self._fallback(role, key, "timeout")
+        except Exception as e:
+            logger.warning(f"{role} failed: {e}")
+            result, status = self._fallback(role, key, "error")
+        return result, status, (time.perf_counter() - start) * 1000
 
-    async def get_final_decision(self, aggregated_data: dict):
+    async def _validate(self, strategist_task, aggregated_data: dict, keys: dict) -> tuple:
+        """Cross-checks the strategist's decision once it is in; the validator's budget starts then."""
+        decision, _, _ = await asyncio.shield(strategist_task)
+        decision = str(decision or "HOLD").strip().upper()
+        # An old verdict only stands in for a verdict on the same decision
+        keys["validator"] = keys["validator"] + (decision,)
+        return await self._run_role(
+            "validator", self.roles['validator'].validate_decision(decision, aggregated_data), keys["validator"])
+
+    async def get_decision_report(self, aggregated_data: dict, portfolio_data: dict = None) -> dict:
         """
-        Uses 'STRATEGIST' to decide, and 'VALIDATOR' to cross-check (Future).
-        For now, simplistic flow.
+        Queries STRATEGIST and RISK_OFFICER concurrently; VALIDATOR gets the
+        strategist's decision and the same inputs as soon as it is in and
+        answers agree/disagree. Each role has its own budget and the whole
+        decision is cut off at DECISION_DEADLINE. A role that times out or
+        fails reuses its last good answer for the same symbol (status 'stale',
+        up to ROLE_STALE_TTL old) and falls back to ROLE_DEFAULTS only when
+        there is none.
         """
-        decision = await self.roles['strategist'].make_decision(aggregated_data)
-        return decision
+        start = time.perf_counter()
+        symbol = aggregated_data.get("symbol") if isinstance(aggregated_data, dict) else None
+        keys = {role: (role, symbol) for role in ROLE_DEFAULTS}
+        tasks = {}
+        if self.roles.get('strategist'):
+            tasks["strategist"] = asyncio.ensure_future(self._run_role(
+                "strategist", self.roles['strategist'].make_decision(aggregated_data), keys["strategist"]))
+            if self.roles.get('validator'):
+                tasks["validator"] = asyncio.ensure_future(
+                    self._validate(tasks["strategist"], aggregated_data, keys))
+        if self.roles.get('risk_officer'):
+            risk_call = self.roles['risk_officer'].check_risk(
+                portfolio_data if portfolio_data is not None else aggregated_data)
+            tasks["risk_officer"] = asyncio.ensure_future(
+                self._run_role("risk_officer", risk_call, keys["risk_officer"]))
+        done, pending = await asyncio.wait(tasks.values(), timeout=DECISION_DEADLINE) if tasks else (set(), set())
+        for task in pending:
+            task.cancel()
+
+        results, status, latency = {}, {}, {}
+        for role in ROLE_DEFAULTS:
+            task = tasks.get(role)
+            if task is None:
+                results[role], status[role], latency[role] = ROLE_DEFAULTS[role], "unassigned", 0.0
+            elif task in done:
+                results[role], status[role], latency[role] = task.result()
+            else:
+                results[role], status[role] = self._fallback(role, keys[role], "deadline")
+                latency[role] = DECISION_DEADLINE * 1000
+
+        decision = str(results["strategist"] or "HOLD").strip().upper()
+        reason = "strategist"
+        if decision != "HOLD" and results["validator"] is not None and not results["validator"].get("agree", False):
+            decision, reason = "HOLD", "validator disagreed"
+        elif decision != "HOLD" and not (results["risk_officer"] or {}).get("approved", False):
+            decision, reason = "HOLD", "risk officer rejected"
+
+        latency["total"] = (time.perf_counter() - start) * 1000
+        self.last_report = {
+            "decision": decision,
+            "reason": reason,
+            "roles": results,
+            "status": status,
+            "latency_ms": latency,
+        }
+        return self.last_report
+
+    async def get_final_decision(self, aggregated_data: dict, portfolio_data: dict = None):
+        """
+        Uses 'STRATEGIST' to decide, 'VALIDATOR' to cross-check that decision and
+        'RISK_OFFICER' to approve in parallel. The full breakdown is kept in self.last_report.
+        """
+        report = await self.get_decision_report(aggregated_data, portfolio_data)
+        return report["decision"]
+
+    def get_cache_stats(self) -> dict:
+        """Shared AI response cache counters (hits, misses, evictions, hit ratio)."""
+        return self.roles['scout'].cache_stats()
+
+    async def close(self):
+        """Releases pooled provider sessions (call on shutdown)."""
+        for provider in {id(p): p for p in self.roles.values() if p}.values():
+            await provider.close()
 
 # --- Execution Test (Run this file directly to test) ---
 if __name__ == "__main__":
+    import sys
     import asyncio
     
     async def test_brain():
@@ -93,5 +237,64 @@ if __name__ == "__main__":
         pattern = await brain.analyze_chart_pattern(dummy_data)
         print(f"Result: {pattern}")
 
-    # Run loop
-    asyncio.run(test_brain())
+    async def self_test():
+        # Offline role checks against mock providers (no keys, no network)
+        from src.python.ai.core.response_cache import ResponseCache
+        from src.python.ai.providers.mock_provider import MockProvider
+
+        def mock(name, **responses):
+            return MockProvider(name=name, latency=0.01, responses=responses, cache=ResponseCache(redis_url=None))
+
+        data = {"symbol": "BTC/USDT", "trend": "up"}
+        approve = {"approved": True, "reason": "ok"}
+
+        print("\n🧪 Strategist and validator agree...")
+        brain = HybridBrain(roles={"strategist": mock("S", decision="BUY"),
+                                   "validator": mock("V", validation={"agree": True, "reason": "trend up"}),
+                                   "risk_officer": mock("R", risk=approve)})
+        report = await brain.get_decision_report(data)
+        assert report["decision"] == "BUY", report
+        assert report["status"]["validator"] == "ok", report
+
+        print("🧪 Validator disagrees with the strategist...")
+        validator = mock("V", validation={"agree": False, "reason": "divergence"})
+        brain = HybridBrain(roles={"strategist": mock("S", decision="BUY"), "validator": validator,
+                                   "risk_officer": mock("R", risk=approve)})
+        report = await brain.get_decision_report(data)
+        assert report["decision"] == "HOLD" and report["reason"] == "validator disagreed", report
+        # The validator saw the strategist's answer, not just the raw inputs
+        assert validator.api_calls == 1
+
+        print("🧪 Timed-out roles reuse the last good answer per symbol...")
+        strategist = mock("S", decision="BUY")
+        brain = HybridBrain(roles={"strategist": strategist,
+                                   "validator": mock("V", validation={"agree": True, "reason": "ok"}),
+                                   "risk_officer": mock("R", risk=approve)})
+        await brain.get_decision_report(data)
+        strategist.latency = 0.2
+        ROLE_TIMEOUTS["strategist"] = 0.05
+        report = await brain.get_decision_report({**data, "trend": "flat"})
+        assert report["status"]["strategist"] == "stale" and report["decision"] == "BUY", report
+        # Nothing cached for a new symbol: conservative default
+        report = await brain.get_decision_report({"symbol": "ETH/USDT", "trend": "flat"})
+        assert report["status"]["strategist"] == "timeout" and report["decision"] == "HOLD", report
+
+        print("🧪 Provider errors reuse the last good answer instead of replacing it...")
+        ROLE_TIMEOUTS["strategist"] = 8
+        strategist, risk = mock("S", decision="BUY"), mock("R", risk=approve)
+        brain = HybridBrain(roles={"strategist": strategist,
+                                   "validator": mock("V", validation={"agree": True, "reason": "ok"}),
+                                   "risk_officer": risk})
+        await brain.get_decision_report(data)
+        strategist.error_rate = risk.error_rate = 1.0
+        for _ in range(2):  # the error must not overwrite the cached answer
+            report = await brain.get_decision_report({**data, "trend": "sideways"})
+            assert report["status"]["strategist"] == "stale" and report["decision"] == "BUY", report
+            assert report["status"]["risk_officer"] == "stale" and report["roles"]["risk_officer"] == approve, report
+        print("✅ HybridBrain self-test passed")
+
+    if "--self-test" in sys.argv:
+        asyncio.run(self_test())
+    else:
+        # Run loop
+        asyncio.run(test_brain())
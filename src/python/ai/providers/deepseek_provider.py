@@ -1,44 +1,80 @@
 import os
-import requests
+import httpx
 from src.python.ai.core.provider_interface import BaseAIProvider
 import json
 
 class DeepSeekProvider(BaseAIProvider):
     def __init__(self):
+        super().__init__()
         self.api_key = os.getenv("DEEPSEEK_API_KEY")
         # Note: We don't raise error here, because Orchestrator handles the fallback
         self.api_url = "https://api.deepseek.com/v1/chat/completions" # Example URL
+        self.timeout = float(os.getenv("DEEPSEEK_TIMEOUT", 30))
+        # Pooled keep-alive session, created lazily on the running loop
+        self._client = None
 
     def get_name(self) -> str:
         return "DeepSeek V3 (Strategist)"
 
-    def _call_api(self, prompt):
-        if not self.api_key:
-            raise RuntimeError("DeepSeek API Key missing")
-        
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            )
+        return self._client
+
+    async def _post(self, prompt):
         headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
         payload = {
             "model": "deepseek-chat",
             "messages": [{"role": "user", "content": prompt}]
         }
-        response = requests.post(self.api_url, json=payload, headers=headers)
+        response = await self._get_client().post(self.api_url, json=payload, headers=headers)
+        response.raise_for_status()
         return response.json()['choices'][0]['message']['content']
 
+    async def _call_api(self, prompt):
+        if not self.api_key:
+            raise RuntimeError("DeepSeek API Key missing")
+        return await self._post(prompt)
+
+    async def _complete(self, prompt: str) -> str:
+        return await self._call_api(prompt)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
     async def analyze_sentiment(self, text: str) -> dict:
         # DeepSeek is better at nuance
         prompt = f"Deep analyze sentiment: {text}. JSON format: {{'score': float, 'label': str}}"
-        resp = self._call_api(prompt)
-        return json.loads(resp)
+
+        async def _call():
+            return self._parse_json(await self._call_api(prompt))
+
+        # Cached by text; identical concurrent requests share one call
+        return await self._cached_call("sentiment", text, _call)
 
     async def analyze_pattern(self, ohlcv_data: list) -> dict:
         # DeepSeek V3 excels at math/logic
         prompt = f"Analyze OHLCV math patterns: {str(ohlcv_data)}. JSON format."
-        resp = self._call_api(prompt)
-        return json.loads(resp)
+
+        async def _call():
+            return self._parse_json(await self._call_api(prompt))
+
+        return await self._cached_call("pattern", ohlcv_data, _call)
 
     # ... Implement other methods similarly ...
     async def check_risk(self, portfolio_context: dict) -> dict:
         return {"approved": True, "reason": "Not implemented yet"}
 
     async def make_decision(self, analysis_data: dict) -> str:
-        return "HOLD"
+        prompt = f"Based on this analysis: {analysis_data}, what is the signal? Return ONLY one word: BUY, SELL, or HOLD."
+
+        async def _call():
+            return (await self._call_api(prompt)).strip().upper()
+
+        # Errors propagate so the brain can fall back to the last good decision
+        return await self._cached_call("decision", analysis_data, _call)
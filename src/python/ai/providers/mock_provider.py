@@ -0,0 +1,87 @@
+import re
+import json
+import random
+import asyncio
+import hashlib
+from src.python.ai.core.provider_interface import BaseAIProvider, NEUTRAL_SENTIMENT
+from src.python.ai.core.response_cache import ResponseCache
+
+
+class MockProvider(BaseAIProvider):
+    """
+    Local, deterministic stand-in for a real LLM provider (no keys, no network).
+    Latency, jitter and error rate are configurable and seeded, so runs are
+    reproducible. Sentiment scores are derived from a hash of the text.
+    """
+
+    def __init__(self, name: str = "Mock", latency: float = 0.05, jitter: float = 0.0,
+                 error_rate: float = 0.0, responses: dict = None, seed: int = 42,
+                 cache: ResponseCache = None):
+        super().__init__(cache=cache)
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.responses = {
+            "decision": "HOLD",
+            "risk": {"approved": True, "reason": "Mock approval"},
+            "pattern": {"pattern": "None", "signal": "none"},
+            "validation": {"agree": True, "reason": "Mock agreement"},
+            **(responses or {}),
+        }
+        self.api_calls = 0
+        self.errors = 0
+
+    def get_name(self) -> str:
+        return f"{self.name} (Mock)"
+
+    async def _simulate_call(self):
+        self.api_calls += 1
+        delay = self.latency + self.rng.uniform(-self.jitter, self.jitter)
+        await asyncio.sleep(max(0.0, delay))
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            raise RuntimeError("Mock API error")
+
+    @staticmethod
+    def score_text(text: str) -> dict:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=2).digest()
+        score = round(int.from_bytes(digest, "big") / 65535 * 2 - 1, 3)
+        label = "Positive" if score > 0.2 else "Negative" if score < -0.2 else "Neutral"
+        return {"score": score, "label": label}
+
+    async def _complete(self, prompt: str) -> str:
+        # Only batch sentiment prompts reach here: answer every numbered item
+        await self._simulate_call()
+        items = re.findall(r'^\s*(\d+)\. (".*")\s*$', prompt, re.MULTILINE)
+        return json.dumps([{"id": int(i), **self.score_text(json.loads(text))} for i, text in items])
+
+    async def _respond(self, kind: str, payload, value_func):
+        async def _call():
+            await self._simulate_call()
+            return value_func()
+        return await self._cached_call(kind, payload, _call)
+
+    async def analyze_sentiment(self, text: str) -> dict:
+        try:
+            return await self._respond("sentiment", text, lambda: self.score_text(text))
+        except Exception:
+            return dict(NEUTRAL_SENTIMENT)
+
+    async def analyze_pattern(self, ohlcv_data: list) -> dict:
+        try:
+            return await self._respond("pattern", ohlcv_data[-20:], lambda: self.responses["pattern"])
+        except Exception:
+            return {"pattern": "Unknown", "signal": "none"}
+
+    # Role calls let errors propagate, like the real providers, so the brain can fall back
+    async def check_risk(self, portfolio_context: dict) -> dict:
+        return await self._respond("risk", portfolio_context, lambda: self.responses["risk"])
+
+    async def make_decision(self, analysis_data: dict) -> str:
+        return await self._respond("decision", analysis_data, lambda: self.responses["decision"])
+
+    async def validate_decision(self, decision: str, analysis_data: dict) -> dict:
+        return await self._respond("validation", {"decision": decision, "data": analysis_data},
+                                   lambda: self.responses["validation"])
@@ -0,0 +1,615 @@
+import os
+import time
+import asyncio
+import calendar
+import datetime
+import logging
+import argparse
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CCXT_API_KEY = os.getenv('CCXT_API_KEY')
+CCXT_API_SECRET = os.getenv('CCXT_API_SECRET')
+STATUS_TTL = float(os.getenv('EXCHANGE_STATUS_TTL', 60))
+STATUS_ERROR_TTL = float(os.getenv('EXCHANGE_STATUS_ERROR_TTL', 10))
+
+
+def default_exchange_factory(exchange_id: str) -> Optional[Any]:
+    """Creates a ccxt async client, or None if ccxt has no such exchange."""
+    import ccxt.async_support as ccxt_async  # heavy import, only when a client is needed
+
+    exc_class = getattr(ccxt_async, exchange_id, None)
+    if exc_class is None:
+        return None
+    params = {'enableRateLimit': True}
+    if CCXT_API_KEY:
+        params.update({'apiKey': CCXT_API_KEY, 'secret': CCXT_API_SECRET})
+    return exc_class(params)
+
+
+class ExchangeClientPool:
+    """
+    Long-lived async exchange clients keyed by exchange id.
+    Clients are created lazily and reused, so HTTP sessions and TLS connections
+    survive between calls. Status results are cached per exchange for `status_ttl`
+    seconds (failures for `error_ttl`) and concurrent status checks for the same
+    exchange share one request.
+    """
+
+    def __init__(self, factory: Callable[[str], Optional[Any]] = default_exchange_factory,
+                 status_ttl: float = STATUS_TTL, error_ttl: float = STATUS_ERROR_TTL):
+        self.factory = factory
+        self.status_ttl = status_ttl
+        self.error_ttl = error_ttl
+        self._clients: Dict[str, Any] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._status: Dict[str, Tuple[float, bool]] = {}  # exchange -> (expires_at, is_ok)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._closing: Optional[asyncio.Future] = None
+        self.stats = {'created': 0, 'status_requests': 0, 'status_cache_hits': 0}
+
+    def _bind_loop(self):
+        # aiohttp sessions belong to the loop that created them; clients left
+        # behind by another loop are closed (best effort) and replaced.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._clients:
+                logger.warning(f"Event loop changed, closing {len(self._clients)} pooled exchange clients")
+                stale, old_loop = self._clients, self._loop
+                if old_loop is not None and old_loop.is_running():
+                    asyncio.run_coroutine_threadsafe(self._close_clients(stale), old_loop)
+                else:
+                    self._closing = asyncio.ensure_future(self._close_clients(stale))
+            self._clients = {}
+            self._inflight = {}
+            self._lock = asyncio.Lock()
+            self._loop = loop
+
+    async def get(self, exchange: str) -> Optional[Any]:
+        """Returns the pooled client for `exchange`, creating it on first use."""
+        self._bind_loop()
+        exchange_id = exchange.lower()
+        client = self._clients.get(exchange_id)
+        if client is not None:
+            return client
+        async with self._lock:
+            client = self._clients.get(exchange_id)
+            if client is None:
+                client = self.factory(exchange_id)
+                if client is None:
+                    return None
+                self._clients[exchange_id] = client
+                self.stats['created'] += 1
+            return client
+
+    @staticmethod
+    async def _close_clients(clients: Dict[str, Any]):
+        for exchange_id, client in clients.items():
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Closing {exchange_id} client failed: {e}")
+
+    async def _discard(self, exchange_id: str):
+        client = self._clients.pop(exchange_id, None)
+        if client is not None:
+            await self._close_clients({exchange_id: client})
+
+    async def _fetch_status(self, exchange_id: str) -> bool:
+        client = await self.get(exchange_id)
+        if client is None or not client.has.get('fetchStatus'):
+            return True
+        try:
+            self.stats['status_requests'] += 1
+            status = await client.fetch_status()
+        except Exception as e:
+            logger.error(f"Async status check failed: {e}")
+            await self._discard(exchange_id)  # next call reconnects
+            self._status[exchange_id] = (time.monotonic() + self.error_ttl, True)
+            return True
+        is_ok = status.get('status') == 'ok'
+        self._status[exchange_id] = (time.monotonic() + self.status_ttl, is_ok)
+        return is_ok
+
+    async def fetch_status(self, exchange: str) -> bool:
+        """Exchange status with a per-exchange TTL cache; errors count as open."""
+        exchange_id = exchange.lower()
+        cached = self.peek_status(exchange_id)
+        if cached is not None:
+            self.stats['status_cache_hits'] += 1
+            return cached
+
+        self._bind_loop()
+        future = self._inflight.get(exchange_id)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_status(exchange_id))
+            self._inflight[exchange_id] = future
+            future.add_done_callback(lambda _: self._inflight.pop(exchange_id, None))
+        return await asyncio.shield(future)
+
+    def peek_status(self, exchange: str) -> Optional[bool]:
+        """Cached status if still fresh, without touching the network."""
+        cached = self._status.get(exchange.lower())
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
+        return None
+
+    def invalidate(self, exchange: Optional[str] = None):
+        """Forgets cached status for one exchange (or all)."""
+        if exchange is None:
+            self._status.clear()
+        else:
+            self._status.pop(exchange.lower(), None)
+
+    async def close(self):
+        """Shutdown hook: closes every pooled client on the current loop."""
+        for exchange_id in list(self._clients):
+            await self._discard(exchange_id)
+        closing, self._closing = self._closing, None
+        if closing is not None and closing.get_loop() is asyncio.get_running_loop():
+            await closing  # clients handed over from an earlier loop
+
+    async def release_loop(self):
+        """Closes clients bound to the running loop (for short-lived asyncio.run callers)."""
+        if self._loop is asyncio.get_running_loop():
+            await self.close()
+            self._loop = None
+
+
+# Global pool instance
+exchange_pool = ExchangeClientPool()
+
+
+async def close_exchange_pool():
+    await exchange_pool.close()
+
+
+# --- OHLCV backfill -----------------------------------------------------------
+
+BACKFILL_PAGE_LIMIT = int(os.getenv('BACKFILL_PAGE_LIMIT', 1000))
+BACKFILL_WORKERS = int(os.getenv('BACKFILL_WORKERS', 16))          # jobs in flight
+BACKFILL_PAGE_WINDOW = int(os.getenv('BACKFILL_PAGE_WINDOW', 4))   # pages in flight per job
+BACKFILL_MAX_IN_FLIGHT = int(os.getenv('BACKFILL_MAX_IN_FLIGHT', 8))  # requests per exchange
+BACKFILL_RETRIES = int(os.getenv('BACKFILL_RETRIES', 5))
+BACKFILL_DEFAULT_SINCE = int(os.getenv('BACKFILL_DEFAULT_SINCE', 1_483_228_800_000))  # 2017-01-01 UTC
+
+_TIMEFRAME_UNITS = {'s': 1_000, 'm': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000,
+                    'M': 2_592_000_000, 'y': 31_536_000_000}
+# Shortest real length of the calendar units, where the nominal one above is only an average
+_TIMEFRAME_MIN_UNITS = {'M': 2_419_200_000, 'y': 31_536_000_000}
+# ccxt error classes that will not succeed on retry
+_PERMANENT_ERRORS = {'BadSymbol', 'BadRequest', 'NotSupported', 'AuthenticationError', 'PermissionDenied'}
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """'1m' -> 60000, same units as ccxt.Exchange.parse_timeframe, without importing ccxt."""
+    try:
+        return int(timeframe[:-1]) * _TIMEFRAME_UNITS[timeframe[-1]]
+    except (KeyError, ValueError):
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+
+def candle_close_ms(open_ms: int, timeframe: str) -> int:
+    """
+    Close time of the candle opening at `open_ms`. Months and years are
+    calendar lengths (a February 1M candle is 28/29 days); other units are
+    fixed. Where a candle opens is up to the venue (Binance 1w opens Monday).
+    """
+    unit = timeframe[-1]
+    if unit not in ('M', 'y'):
+        return open_ms + timeframe_to_ms(timeframe)
+    opened = datetime.datetime.fromtimestamp(open_ms / 1000, tz=datetime.timezone.utc)
+    month = opened.month - 1 + int(timeframe[:-1]) * (12 if unit == 'y' else 1)
+    year, month = opened.year + month // 12, month % 12 + 1
+    closed = opened.replace(year=year, month=month, day=min(opened.day, calendar.monthrange(year, month)[1]))
+    return int(closed.timestamp() * 1000)
+
+
+def _min_step(timeframe: str) -> int:
+    """Lower bound on the distance between two candle opens."""
+    unit = timeframe[-1]
+    if unit in _TIMEFRAME_MIN_UNITS:
+        return int(timeframe[:-1]) * _TIMEFRAME_MIN_UNITS[unit]
+    return timeframe_to_ms(timeframe)
+
+
+class RateLimiter:
+    """
+    Per-exchange request gate: at most `rate` requests/s with bursts of
+    `burst`, and at most `max_in_flight` outstanding requests.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, max_in_flight: int = BACKFILL_MAX_IN_FLIGHT):
+        self.interval = 1.0 / rate
+        self.burst = max(1, burst)
+        self._tat = 0.0  # theoretical arrival time of the next request
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self.waited = 0.0
+
+    async def __aenter__(self):
+        await self._in_flight.acquire()
+        now = time.monotonic()
+        start = max(self._tat, now - (self.burst - 1) * self.interval)
+        self._tat = start + self.interval
+        if start > now:
+            self.waited += start - now
+            await asyncio.sleep(start - now)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._in_flight.release()
+
+
+class BackfillJob(NamedTuple):
+    exchange: str
+    symbol: str
+    timeframe: str
+    since: Optional[int] = None  # ms; default: resume point from the sink, else BACKFILL_DEFAULT_SINCE
+    until: Optional[int] = None  # ms, exclusive; default: now
+
+
+class OHLCVSink(ABC):
+    """
+    Storage side of a backfill. Pages arrive per job in timestamp order, so
+    `last_timestamp` after a partial run is a valid resume point.
+    """
+
+    @abstractmethod
+    async def last_timestamp(self, exchange: str, symbol: str, timeframe: str) -> Optional[int]:
+        """Open time (ms) of the newest stored candle, or None if there is none."""
+        pass
+
+    @abstractmethod
+    async def write(self, exchange: str, symbol: str, timeframe: str, candles: List[list]):
+        """Appends closed candles, oldest first, all newer than last_timestamp."""
+        pass
+
+
+class MemorySink(OHLCVSink):
+    """Keeps candles in lists; for tests and the offline benchmark."""
+
+    def __init__(self):
+        self.data: Dict[Tuple[str, str, str], List[list]] = {}
+
+    async def last_timestamp(self, exchange, symbol, timeframe):
+        candles = self.data.get((exchange, symbol, timeframe))
+        return candles[-1][0] if candles else None
+
+    async def write(self, exchange, symbol, timeframe, candles):
+        self.data.setdefault((exchange, symbol, timeframe), []).extend(candles)
+
+
+class JobProgress:
+    __slots__ = ('job', 'state', 'start', 'end', 'cursor', 'pages', 'requests', 'rows', 'retries', 'error')
+
+    def __init__(self, job: BackfillJob):
+        self.job = job
+        self.state = 'pending'  # pending -> running -> done | failed
+        self.start = self.end = self.cursor = None
+        self.pages = self.requests = self.rows = self.retries = 0
+        self.error = None
+
+    @property
+    def percent(self) -> Optional[float]:
+        if self.state == 'done':
+            return 100.0
+        if self.start is None or self.cursor is None or self.end <= self.start:
+            return None
+        return round(100 * (self.cursor - self.start) / (self.end - self.start), 1)
+
+    def as_dict(self) -> dict:
+        return {'exchange': self.job.exchange, 'symbol': self.job.symbol, 'timeframe': self.job.timeframe,
+                'state': self.state, 'percent': self.percent, 'pages': self.pages, 'requests': self.requests,
+                'rows': self.rows, 'retries': self.retries, 'error': self.error}
+
+
+class OHLCVBackfill:
+    """
+    Incremental OHLCV backfill for many (exchange, symbol, timeframe) jobs.
+
+    Each job resumes just after the sink's last stored timestamp (the venue
+    decides where the next candle opens; nothing is aligned to the epoch),
+    splits the remaining range into pages of about `page_limit` candles, fetches up
+    to `page_window` of them concurrently and hands them to the sink strictly
+    in order, so memory stays at about `workers * page_window` pages however
+    long the history is. Requests go through one RateLimiter per exchange,
+    sized from the client's ccxt `rateLimit` unless overridden; ccxt's own
+    throttle is switched off on the clients it uses, so requests are not
+    queued twice. A candle is
+    written only once closed (open + its own length <= now, calendar length
+    for 1M/1y), so a rerun only fetches the delta.
+    """
+
+    def __init__(self, sink: OHLCVSink, pool: ExchangeClientPool = exchange_pool,
+                 workers: int = BACKFILL_WORKERS, page_limit: int = BACKFILL_PAGE_LIMIT,
+                 page_window: int = BACKFILL_PAGE_WINDOW, retries: int = BACKFILL_RETRIES,
+                 rate_limits: Optional[Dict[str, float]] = None):
+        self.sink = sink
+        self.pool = pool
+        self.workers = workers
+        self.page_limit = page_limit
+        self.page_window = page_window
+        self.retries = retries
+        self.rate_limits = rate_limits or {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self.progress: Dict[BackfillJob, JobProgress] = {}
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+    def _limiter(self, exchange: str, client) -> RateLimiter:
+        limiter = self._limiters.get(exchange)
+        if limiter is None:
+            rate = self.rate_limits.get(exchange) or 1000 / max(getattr(client, 'rateLimit', 100) or 100, 1)
+            limiter = self._limiters[exchange] = RateLimiter(rate, burst=max(1, int(rate)))
+        return limiter
+
+    async def _fetch(self, client, limiter: RateLimiter, progress: JobProgress, since: int) -> List[list]:
+        job = progress.job
+        delay = 0.5
+        for attempt in range(self.retries + 1):
+            try:
+                async with limiter:
+                    progress.requests += 1
+                    return await client.fetch_ohlcv(job.symbol, job.timeframe, since=since, limit=self.page_limit)
+            except Exception as e:
+                if type(e).__name__ in _PERMANENT_ERRORS or attempt == self.retries:
+                    raise
+                progress.retries += 1
+                logger.warning(f"OHLCV {job.exchange} {job.symbol} {job.timeframe} @ {since} failed "
+                               f"({type(e).__name__}: {e}), retry {attempt + 1}/{self.retries}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    async def _fetch_page(self, client, limiter, progress: JobProgress, page_start: int, page_end: int,
+                          now: int) -> List[list]:
+        """
+        Closed candles opening in [page_start, page_end); follows up if the
+        venue caps the page below page_limit.
+        """
+        timeframe = progress.job.timeframe
+        min_step = _min_step(timeframe)
+        candles: List[list] = []
+        since = page_start
+        while since < page_end:
+            raw = await self._fetch(client, limiter, progress, since)
+            if not raw:
+                break
+            candles.extend(c for c in raw if since <= c[0] < page_end and candle_close_ms(c[0], timeframe) <= now)
+            if raw[-1][0] + min_step >= page_end:
+                break  # the next candle opens in the next page
+            since = raw[-1][0] + 1
+        return candles
+
+    async def _run_job(self, progress: JobProgress):
+        job = progress.job
+        progress.state = 'running'
+        client = await self.pool.get(job.exchange)
+        if client is None or not client.has.get('fetchOHLCV'):
+            raise ValueError(f"{job.exchange} does not support fetchOHLCV")
+        limiter = self._limiter(job.exchange, client)
+        # The limiter above gates every backfill request; ccxt's enableRateLimit would
+        # serialize them again behind its own throttle. Other pool users (status checks)
+        # are TTL-cached and far below the venue's limit.
+        if getattr(client, 'enableRateLimit', False):
+            client.enableRateLimit = False
+        step = timeframe_to_ms(job.timeframe)
+
+        last = await self.sink.last_timestamp(job.exchange, job.symbol, job.timeframe)
+        # Anything after the last stored open; the venue returns the next candle it has
+        start = last + 1 if last is not None else (job.since if job.since is not None else BACKFILL_DEFAULT_SINCE)
+        now = int(time.time() * 1000)
+        # Pages cover candle opens before `end`; the still-open candle is filtered per candle
+        end = min(job.until or now, now)
+        progress.start, progress.end, progress.cursor = start, end, start
+        if start >= end:
+            progress.state = 'done'
+            return
+
+        if last is None:
+            # Fresh history: one probe finds where the listing actually starts, so we
+            # don't fan out over years of empty pages (venues that answer an early
+            # `since` with nothing just get the full fan-out)
+            probe = await self._fetch(client, limiter, progress, start)
+            if probe and start < probe[0][0] < end:
+                start = progress.start = progress.cursor = probe[0][0]
+
+        span = self.page_limit * step
+        pages = deque()
+        next_start = start
+        while pages or next_start < end:
+            while next_start < end and len(pages) < self.page_window:
+                page_end = min(next_start + span, end)
+                pages.append((page_end, asyncio.ensure_future(
+                    self._fetch_page(client, limiter, progress, next_start, page_end, now))))
+                next_start = page_end
+            page_end, task = pages.popleft()
+            try:
+                candles = await task
+            except BaseException:
+                for _, pending in pages:
+                    pending.cancel()
+                raise
+            await self._write(progress, candles, page_end)
+        progress.state = 'done'
+
+    async def _write(self, progress: JobProgress, candles: List[list], page_end: int):
+        if candles:
+            job = progress.job
+            await self.sink.write(job.exchange, job.symbol, job.timeframe, candles)
+            progress.rows += len(candles)
+        progress.pages += 1
+        progress.cursor = page_end
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            try:
+                progress = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                await self._run_job(progress)
+            except Exception as e:
+                progress.state = 'failed'
+                progress.error = f"{type(e).__name__}: {e}"
+                logger.error(f"Backfill {progress.job.exchange} {progress.job.symbol} "
+                             f"{progress.job.timeframe} failed: {progress.error}")
+
+    async def run(self, jobs: Iterable[BackfillJob]) -> dict:
+        """Runs all jobs (failures are recorded per job, not raised) and returns metrics()."""
+        queue: asyncio.Queue = asyncio.Queue()
+        for job in jobs:
+            progress = self.progress[job] = JobProgress(job)
+            queue.put_nowait(progress)
+        self._started_at, self._finished_at = time.monotonic(), None
+        await asyncio.gather(*[self._worker(queue) for _ in range(min(self.workers, queue.qsize()) or 1)])
+        self._finished_at = time.monotonic()
+        return self.metrics()
+
+    def metrics(self) -> dict:
+        """Aggregate progress and throughput; cheap enough to poll while run() is going."""
+        jobs = list(self.progress.values())
+        elapsed = ((self._finished_at or time.monotonic()) - self._started_at) if self._started_at else 0.0
+        rows = sum(p.rows for p in jobs)
+        requests = sum(p.requests for p in jobs)
+        states: Dict[str, int] = {}
+        for p in jobs:
+            states[p.state] = states.get(p.state, 0) + 1
+        return {
+            'jobs': len(jobs), 'states': states, 'rows': rows, 'requests': requests,
+            'retries': sum(p.retries for p in jobs), 'elapsed_s': round(elapsed, 3),
+            'rows_per_s': round(rows / elapsed, 1) if elapsed else 0.0,
+            'requests_per_s': round(requests / elapsed, 1) if elapsed else 0.0,
+            'rate_limit_wait_s': {ex: round(l.waited, 3) for ex, l in self._limiters.items()},
+            'failed': [p.as_dict() for p in jobs if p.state == 'failed'],
+        }
+
+
+class FakeExchange:
+    """
+    Offline ccxt-style stand-in. The first request on a fresh client pays
+    `connect_latency` (session + TLS + metadata), later ones `request_latency`.
+    OHLCV is a deterministic walk starting at `listed_at` (ms), served at most
+    `ohlcv_limit` candles per request like a real venue, including the
+    still-open candle. Candles open where Binance puts them: epoch multiples,
+    except 1w on Mondays and 1M on the first of the month.
+    """
+
+    def __init__(self, exchange_id: str = 'fake', connect_latency: float = 0.05,
+                 request_latency: float = 0.002, status: str = 'ok', listed_at: int = 1_577_836_800_000,
+                 ohlcv_limit: int = 1000, rate_limit_ms: int = 50):
+        self.id = exchange_id
+        self.has = {'fetchStatus': True, 'fetchOHLCV': True}
+        self.timeframes = {tf: tf for tf in ('1m', '5m', '15m', '1h', '4h', '1d', '1w', '1M')}
+        self.rateLimit = rate_limit_ms
+        self.connect_latency = connect_latency
+        self.request_latency = request_latency
+        self.status = status
+        self.listed_at = listed_at
+        self.ohlcv_limit = ohlcv_limit
+        self.connected = False
+        self.requests = 0
+
+    async def _request(self):
+        if not self.connected:
+            await asyncio.sleep(self.connect_latency)
+            self.connected = True
+        await asyncio.sleep(self.request_latency)
+        self.requests += 1
+
+    async def fetch_status(self) -> dict:
+        await self._request()
+        return {'status': self.status, 'updated': int(time.time() * 1000)}
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: Optional[int] = None,
+                          limit: Optional[int] = None) -> List[list]:
+        await self._request()
+        step = timeframe_to_ms(timeframe)
+        now = int(time.time() * 1000)
+        limit = min(limit or self.ohlcv_limit, self.ohlcv_limit)
+        ts = max(since if since is not None else now - limit * step, self.listed_at)
+        # First candle open at or after `since`
+        if timeframe[-1] == 'M':
+            day = datetime.datetime.fromtimestamp(ts / 1000, tz=datetime.timezone.utc)
+            month_start = int(datetime.datetime(day.year, day.month, 1, tzinfo=datetime.timezone.utc).timestamp() * 1000)
+            ts = month_start if month_start == ts else candle_close_ms(month_start, '1M')
+        else:
+            offset = 4 * 86_400_000 if timeframe[-1] == 'w' else 0  # 1970-01-05 was a Monday
+            ts += -(ts - offset) % step
+        base = 100 + sum(map(ord, symbol)) % 100
+        candles = []
+        while len(candles) < limit and ts < now:
+            o = base + (ts // step) % 50
+            candles.append([ts, o, o + 1.0, o - 1.0, o + 0.5, 10.0])
+            ts = candle_close_ms(ts, timeframe)
+        return candles
+
+    async def close(self):
+        self.connected = False
+
+
+if __name__ == "__main__":
+    # Offline benchmarks: fresh client per call vs pooled clients; sequential vs concurrent backfill
+    async def bench(calls: int = 200, exchanges=('binance', 'bybit', 'okx', 'kraken', 'kucoin')):
+        async def fresh(exchange_id):
+            exc = FakeExchange(exchange_id)
+            status = await exc.fetch_status()
+            await exc.close()
+            return status['status'] == 'ok'
+
+        rounds = calls // len(exchanges)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await asyncio.gather(*[fresh(exc) for exc in exchanges])
+        fresh_time = time.perf_counter() - start
+
+        pool = ExchangeClientPool(factory=FakeExchange, status_ttl=0)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await asyncio.gather(*[pool.fetch_status(exc) for exc in exchanges])
+        pooled_time = time.perf_counter() - start
+
+        cached = ExchangeClientPool(factory=FakeExchange)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await asyncio.gather(*[cached.fetch_status(exc) for exc in exchanges])
+        cached_time = time.perf_counter() - start
+        await pool.close()
+        await cached.close()
+
+        print(f"Fresh clients:  {calls} calls in {fresh_time * 1000:.1f} ms")
+        print(f"Pooled (no TTL): {calls} calls in {pooled_time * 1000:.1f} ms, stats={pool.stats}")
+        print(f"Pooled + TTL:   {calls} calls in {cached_time * 1000:.1f} ms, stats={cached.stats}")
+
+    async def bench_backfill(symbols: int, timeframe: str, days: int, latency: float):
+        since = int(time.time() * 1000) - days * 86_400_000
+        jobs = [BackfillJob('fake', f"SYM{i}/USDT", timeframe, since=since) for i in range(symbols)]
+
+        def factory(exchange_id):
+            return FakeExchange(exchange_id, request_latency=latency, listed_at=0, rate_limit_ms=5)
+
+        for label, workers, window in (("Sequential", 1, 1), ("Concurrent", BACKFILL_WORKERS, BACKFILL_PAGE_WINDOW)):
+            sink = MemorySink()
+            pool = ExchangeClientPool(factory=factory)
+            metrics = await OHLCVBackfill(sink, pool, workers=workers, page_window=window).run(jobs)
+            print(f"{label + ':':12s}{metrics['rows']} candles, {metrics['requests']} requests in "
+                  f"{metrics['elapsed_s']:.2f}s ({metrics['rows_per_s']:,.0f} rows/s)")
+        rerun = await OHLCVBackfill(sink, pool).run(jobs)
+        print(f"{'Rerun:':12s}{rerun['rows']} candles, {rerun['requests']} requests in {rerun['elapsed_s']:.2f}s")
+        await pool.close()
+
+    parser = argparse.ArgumentParser(description="Offline exchange client benchmarks")
+    parser.add_argument("mode", nargs="?", choices=("status", "backfill"), default="status")
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--timeframe", default="1h")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated request latency (s)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    if args.mode == "backfill":
+        asyncio.run(bench_backfill(args.symbols, args.timeframe, args.days, args.latency))
+    else:
+        asyncio.run(bench())
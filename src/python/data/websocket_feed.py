@@ -0,0 +1,624 @@
+"""
+Streaming market-data ingestion.
+
+StreamingFeed keeps one or more websocket connections to an exchange, each
+multiplexing many symbol streams. Messages are parsed by an exchange adapter
+into normalized rows, checked for per-symbol sequence gaps and written into
+preallocated numpy ring buffers (`feed.ticks`, `feed.bars`). Consumers read
+views of those buffers with a cursor, so nothing is copied per tick:
+
+    feed = StreamingFeed(BinanceAdapter())
+    await feed.start(["BTC/USDT", "ETH/USDT"])
+    cursor = feed.ticks.head
+    while True:
+        await feed.ticks.wait(cursor)
+        chunks, cursor, lost = feed.ticks.read(cursor)
+        for chunk in chunks:          # structured arrays (views)
+            vwap = (chunk['price'] * chunk['qty']).sum() / chunk['qty'].sum()
+
+Connections reconnect with backoff and resubscribe their symbols; a sequence
+jump across the outage is reported as a gap (`feed.gaps`, `on_gap`) so the
+caller can backfill over REST.
+
+ReplayServer is a local stand-in for an exchange (synthetic ticks, optional
+gap and disconnect injection) for offline tests and benchmarks:
+
+    python -m src.python.data.websocket_feed --rate 50000 --seconds 5
+"""
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # stdlib json is ~2x slower but fine below ~50k msgs/s
+    _loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# Normalized records. Timestamps are int64 UTC nanoseconds; side is +1 buy / -1 sell / 0 unknown.
+TICK_DTYPE = np.dtype([
+    ('ts', 'i8'), ('recv_ts', 'i8'), ('symbol_id', 'i4'), ('side', 'i1'),
+    ('seq', 'i8'), ('price', 'f8'), ('qty', 'f8'),
+])
+BAR_DTYPE = np.dtype([
+    ('ts', 'i8'), ('recv_ts', 'i8'), ('symbol_id', 'i4'),
+    ('open', 'f8'), ('high', 'f8'), ('low', 'f8'), ('close', 'f8'), ('volume', 'f8'),
+])
+
+NS_PER_MS = 1_000_000
+
+
+class RingBuffer:
+    """
+    Fixed-capacity array of records. `head` counts every record ever written;
+    record n lives at n % capacity. Single writer (the feed's event loop),
+    any number of cursor-based readers.
+    """
+
+    def __init__(self, dtype: np.dtype, capacity: int):
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.capacity = capacity
+        self.head = 0
+        self._waiter: Optional[asyncio.Future] = None
+
+    def extend(self, rows: np.ndarray):
+        n = len(rows)
+        if n == 0:
+            return
+        if n > self.capacity:
+            rows = rows[-self.capacity:]
+            self.head += n - self.capacity
+            n = self.capacity
+        start = self.head % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = rows[:first]
+        if first < n:
+            self.data[:n - first] = rows[first:]
+        self.head += n
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def read(self, cursor: int, limit: Optional[int] = None) -> Tuple[List[np.ndarray], int, int]:
+        """
+        Records written since `cursor` as at most two views (split at the wrap),
+        the new cursor, and how many records were overwritten before being read.
+        Views stay valid until the writer laps them; process them promptly.
+        """
+        lost = 0
+        oldest = self.head - self.capacity
+        if cursor < oldest:
+            lost, cursor = oldest - cursor, oldest
+        end = self.head if limit is None else min(self.head, cursor + limit)
+        if end <= cursor:
+            return [], cursor, lost
+        start, stop = cursor % self.capacity, end % self.capacity
+        if start < stop or stop == 0:
+            chunks = [self.data[start:stop or self.capacity]]
+        else:
+            chunks = [self.data[start:], self.data[:stop]]
+        return chunks, end, lost
+
+    def latest(self, n: int) -> List[np.ndarray]:
+        """Views of the last n records, oldest first."""
+        chunks, _, _ = self.read(max(self.head - min(n, self.capacity), 0))
+        return chunks
+
+    async def wait(self, cursor: int, timeout: Optional[float] = None) -> bool:
+        """Waits until records past `cursor` exist; False on timeout."""
+        if self.head > cursor:
+            return True
+        if self._waiter is None or self._waiter.done():
+            self._waiter = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._waiter), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.head > cursor
+
+
+class SymbolTable:
+    """Stable symbol <-> int32 id mapping for the ring buffers."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def id(self, symbol: str) -> int:
+        sid = self.ids.get(symbol)
+        if sid is None:
+            sid = self.ids[symbol] = len(self.names)
+            self.names.append(symbol)
+        return sid
+
+
+class FeedAdapter(ABC):
+    """
+    Exchange wire format. parse() returns tick rows (symbol, seq, ts_ns, price,
+    qty, side) and bar rows (symbol, ts_ns, open, high, low, close, volume).
+    seq < 0 means the venue provides no sequence for that row.
+    """
+    name = "base"
+    url = ""
+    max_streams = 200  # symbols multiplexed per connection
+
+    @abstractmethod
+    def subscribe_message(self, symbols: List[str]) -> Optional[str]:
+        """Frame that subscribes `symbols` on an open connection (None: nothing to send)."""
+        pass
+
+    @abstractmethod
+    def unsubscribe_message(self, symbols: List[str]) -> Optional[str]:
+        """Frame that drops `symbols` from an open connection (None: nothing to send)."""
+        pass
+
+    @abstractmethod
+    def parse(self, raw) -> Tuple[list, list]:
+        """Decodes one message into (tick rows, bar rows)."""
+        pass
+
+
+class ReplayAdapter(FeedAdapter):
+    """Protocol spoken by ReplayServer (batched rows, one message per flush)."""
+    name = "replay"
+
+    def __init__(self, url: str = "ws://127.0.0.1:8765", max_streams: int = 200):
+        self.url = url
+        self.max_streams = max_streams
+
+    def subscribe_message(self, symbols):
+        return json.dumps({"op": "subscribe", "symbols": symbols})
+
+    def unsubscribe_message(self, symbols):
+        return json.dumps({"op": "unsubscribe", "symbols": symbols})
+
+    def parse(self, raw):
+        msg = _loads(raw)
+        kind = msg.get("type")
+        if kind == "ticks":
+            return msg["data"], ()
+        if kind == "bars":
+            return (), msg["data"]
+        return (), ()
+
+
+class BinanceAdapter(FeedAdapter):
+    """Binance spot trade + closed-kline streams on the combined endpoint."""
+    name = "binance"
+    url = "wss://stream.binance.com:9443/stream"
+    max_streams = 200  # Binance allows 1024 streams per connection; stay well below
+
+    def __init__(self, kline_interval: Optional[str] = "1m"):
+        self.kline_interval = kline_interval
+        self._by_wire: Dict[str, str] = {}
+        self._next_id = 0
+
+    def _streams(self, symbols):
+        streams = []
+        for symbol in symbols:
+            wire = symbol.replace("/", "").upper()
+            self._by_wire[wire] = symbol
+            streams.append(f"{wire.lower()}@trade")
+            if self.kline_interval:
+                streams.append(f"{wire.lower()}@kline_{self.kline_interval}")
+        return streams
+
+    def _request(self, method, symbols):
+        self._next_id += 1
+        return json.dumps({"method": method, "params": self._streams(symbols), "id": self._next_id})
+
+    def subscribe_message(self, symbols):
+        return self._request("SUBSCRIBE", symbols)
+
+    def unsubscribe_message(self, symbols):
+        return self._request("UNSUBSCRIBE", symbols)
+
+    def parse(self, raw):
+        data = _loads(raw).get("data")
+        if not data:
+            return (), ()
+        symbol = self._by_wire.get(data.get("s"), data.get("s"))
+        if data.get("e") == "trade":
+            # Trade ids are consecutive per symbol, so they double as a sequence
+            side = -1 if data["m"] else 1  # buyer is maker -> seller was the aggressor
+            return [(symbol, data["t"], data["T"] * NS_PER_MS, float(data["p"]), float(data["q"]), side)], ()
+        if data.get("e") == "kline" and data["k"]["x"]:
+            k = data["k"]
+            return (), [(symbol, k["t"] * NS_PER_MS, float(k["o"]), float(k["h"]), float(k["l"]),
+                         float(k["c"]), float(k["v"]))]
+        return (), ()
+
+
+class Gap:
+    __slots__ = ("symbol", "first_missing", "last_missing", "detected_at")
+
+    def __init__(self, symbol: str, first_missing: int, last_missing: int):
+        self.symbol = symbol
+        self.first_missing = first_missing
+        self.last_missing = last_missing
+        self.detected_at = time.time()
+
+    @property
+    def size(self) -> int:
+        return self.last_missing - self.first_missing + 1
+
+    def __repr__(self):
+        return f"Gap({self.symbol}, {self.first_missing}..{self.last_missing})"
+
+
+class FeedConnection:
+    """One websocket carrying up to adapter.max_streams symbols."""
+
+    def __init__(self, feed: "StreamingFeed", index: int):
+        self.feed = feed
+        self.index = index
+        self.symbols: Set[str] = set()
+        self.ws = None
+        self.task: Optional[asyncio.Task] = None
+        self.connected = asyncio.Event()
+        self.reconnects = 0
+        self.messages = 0
+
+    async def send(self, message: Optional[str]):
+        if message and self.ws is not None and self.connected.is_set():
+            try:
+                await self.ws.send(message)
+            except Exception as e:
+                logger.warning(f"Feed connection {self.index} send failed (resubscribes on reconnect): {e}")
+
+    async def _run(self):
+        from websockets.asyncio.client import connect
+        from websockets.exceptions import ConnectionClosed
+
+        adapter = self.feed.adapter
+        backoff = self.feed.reconnect_backoff
+        while True:
+            try:
+                async with connect(adapter.url, max_size=None, compression=None,
+                                   ping_interval=20, ping_timeout=20, open_timeout=10) as ws:
+                    self.ws = ws
+                    self.connected.set()
+                    if self.symbols:
+                        await ws.send(adapter.subscribe_message(sorted(self.symbols)))
+                    backoff = self.feed.reconnect_backoff
+                    on_message = self.feed._on_message
+                    async for raw in ws:
+                        self.messages += 1
+                        on_message(raw)
+            except asyncio.CancelledError:
+                raise
+            except (ConnectionClosed, OSError, asyncio.TimeoutError) as e:
+                logger.warning(f"Feed connection {self.index} lost: {e}")
+            except Exception as e:
+                logger.error(f"Feed connection {self.index} failed: {e}")
+            finally:
+                self.connected.clear()
+                self.ws = None
+            self.reconnects += 1
+            # Full jitter so many connections don't reconnect in lockstep
+            await asyncio.sleep(random.uniform(0, backoff))
+            backoff = min(backoff * 2, self.feed.reconnect_backoff_max)
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self.task = None
+
+
+class StreamingFeed:
+    """Multiplexed, self-healing exchange feed writing into ring buffers."""
+
+    def __init__(self, adapter: FeedAdapter, tick_capacity: int = 1 << 20, bar_capacity: int = 1 << 16,
+                 on_gap: Optional[Callable[[Gap], None]] = None, reconnect_backoff: float = 0.5,
+                 reconnect_backoff_max: float = 30.0):
+        self.adapter = adapter
+        self.symbols = SymbolTable()
+        self.ticks = RingBuffer(TICK_DTYPE, tick_capacity)
+        self.bars = RingBuffer(BAR_DTYPE, bar_capacity)
+        self.on_gap = on_gap
+        self.reconnect_backoff = reconnect_backoff
+        self.reconnect_backoff_max = reconnect_backoff_max
+        self.connections: List[FeedConnection] = []
+        self.gaps: deque = deque(maxlen=1000)
+        self._last_seq: Dict[int, int] = {}
+        self.counters = {"ticks": 0, "bars": 0, "gaps": 0, "missing": 0, "duplicates": 0, "parse_errors": 0}
+
+    # --- message path (hot) ---------------------------------------------------
+
+    def _on_message(self, raw):
+        try:
+            tick_rows, bar_rows = self.adapter.parse(raw)
+        except Exception as e:
+            self.counters["parse_errors"] += 1
+            logger.debug(f"Unparseable feed message: {e}")
+            return
+        recv_ts = time.time_ns()
+        if tick_rows:
+            self._write_ticks(tick_rows, recv_ts)
+        if bar_rows:
+            ids = self.symbols.id
+            self.bars.extend(np.array([(ts, recv_ts, ids(sym), o, h, l, c, v)
+                                       for sym, ts, o, h, l, c, v in bar_rows], dtype=BAR_DTYPE))
+            self.counters["bars"] += len(bar_rows)
+
+    def _write_ticks(self, rows, recv_ts: int):
+        ids = self.symbols.id
+        last_seq = self._last_seq
+        out = []
+        append = out.append
+        for sym, seq, ts, price, qty, side in rows:
+            sid = ids(sym)
+            if seq >= 0:
+                last = last_seq.get(sid)
+                if last is not None:
+                    if seq <= last:
+                        self.counters["duplicates"] += 1
+                        continue
+                    if seq != last + 1:
+                        self._gap(sym, last + 1, seq - 1)
+                last_seq[sid] = seq
+            append((ts, recv_ts, sid, side, seq, price, qty))
+        if out:
+            self.ticks.extend(np.array(out, dtype=TICK_DTYPE))
+            self.counters["ticks"] += len(out)
+
+    def _gap(self, symbol: str, first: int, last: int):
+        gap = Gap(symbol, first, last)
+        self.gaps.append(gap)
+        self.counters["gaps"] += 1
+        self.counters["missing"] += gap.size
+        if self.on_gap is not None:
+            try:
+                self.on_gap(gap)
+            except Exception as e:
+                logger.error(f"on_gap callback failed: {e}")
+
+    # --- subscriptions ---------------------------------------------------------
+
+    def _connection_for(self, symbol: str) -> FeedConnection:
+        for conn in self.connections:
+            if symbol in conn.symbols or len(conn.symbols) < self.adapter.max_streams:
+                return conn
+        conn = FeedConnection(self, len(self.connections))
+        self.connections.append(conn)
+        return conn
+
+    async def subscribe(self, symbols: Iterable[str]):
+        """Adds symbols, packing them onto existing connections before opening new ones."""
+        added: Dict[FeedConnection, List[str]] = {}
+        for symbol in symbols:
+            conn = self._connection_for(symbol)
+            if symbol not in conn.symbols:
+                conn.symbols.add(symbol)
+                self.symbols.id(symbol)
+                added.setdefault(conn, []).append(symbol)
+        for conn, new in added.items():
+            if conn.task is None:
+                conn.start()  # subscribes to everything it holds once connected
+            else:
+                await conn.send(self.adapter.subscribe_message(new))
+
+    async def unsubscribe(self, symbols: Iterable[str]):
+        symbols = set(symbols)  # iterated once per connection
+        for conn in self.connections:
+            gone = [s for s in symbols if s in conn.symbols]
+            if gone:
+                conn.symbols.difference_update(gone)
+                await conn.send(self.adapter.unsubscribe_message(gone))
+                for s in gone:
+                    self._last_seq.pop(self.symbols.id(s), None)
+
+    async def start(self, symbols: Iterable[str] = ()):
+        await self.subscribe(symbols)
+
+    async def wait_connected(self, timeout: float = 10) -> bool:
+        try:
+            await asyncio.wait_for(asyncio.gather(*[c.connected.wait() for c in self.connections]), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def stop(self):
+        await asyncio.gather(*[conn.stop() for conn in self.connections])
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "connections": len(self.connections),
+            "connected": sum(c.connected.is_set() for c in self.connections),
+            "reconnects": sum(c.reconnects for c in self.connections),
+            "messages": sum(c.messages for c in self.connections),
+            "symbols": sum(len(c.symbols) for c in self.connections),
+            "tick_head": self.ticks.head,
+        }
+
+
+class ReplayServer:
+    """
+    Local exchange stand-in speaking the ReplayAdapter protocol. One market
+    task generates a random walk at `rate` ticks/s across every symbol any
+    client has subscribed to, whether or not someone is listening right now,
+    and flushes each client its symbols every `flush_interval` as one batched
+    message. Sequences are per symbol and global to the server, so ticks
+    generated while a client is disconnected show up as a gap after it
+    reconnects and resubscribes.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, rate: float = 10_000,
+                 flush_interval: float = 0.01, gap_every: int = 0, disconnect_every: float = 0,
+                 bar_interval: float = 1.0, seed: int = 7):
+        self.host, self.port = host, port
+        self.rate = rate
+        self.flush_interval = flush_interval
+        self.gap_every = gap_every              # skip one sequence number every N ticks
+        self.disconnect_every = disconnect_every  # seconds between forced disconnects (per connection)
+        self.bar_interval = bar_interval
+        self.rng = random.Random(seed)
+        self._seq: Dict[str, int] = {}
+        self._price: Dict[str, float] = {}
+        self._opens: Dict[str, float] = {}
+        self._clients: Dict[object, Set[str]] = {}  # connection -> subscribed symbols
+        self._market: Optional[asyncio.Task] = None
+        self._server = None
+        self.sent = 0
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def _ticks(self, symbols: List[str], n: int, now_ns: int) -> list:
+        rows = []
+        rng = self.rng
+        for i in range(n):
+            sym = symbols[i % len(symbols)]
+            seq = self._seq.get(sym, 0) + 1
+            if self.gap_every and seq % self.gap_every == 0:
+                seq += 1  # dropped on purpose
+            self._seq[sym] = seq
+            price = self._price.get(sym, 100.0) * (1 + rng.gauss(0, 1e-4))
+            self._price[sym] = price
+            rows.append([sym, seq, now_ns, round(price, 6), round(rng.expovariate(2.0), 6), rng.choice((1, -1))])
+        return rows
+
+    async def _send(self, ws, kind: str, rows: list):
+        try:
+            await ws.send(json.dumps({"type": kind, "data": rows}))
+        except Exception:
+            pass  # the handler notices the closed connection and drops it
+
+    async def _broadcast(self, kind: str, rows: list) -> int:
+        sends, delivered = [], 0
+        for ws, subscribed in list(self._clients.items()):
+            mine = [row for row in rows if row[0] in subscribed]
+            if mine:
+                sends.append(self._send(ws, kind, mine))
+                delivered += len(mine)
+        await asyncio.gather(*sends)
+        return delivered
+
+    async def _run_market(self):
+        carry = 0.0
+        last = last_bar = time.monotonic()
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            now = time.monotonic()
+            elapsed, last = now - last, now
+            # Every symbol ever subscribed keeps trading, listeners or not
+            active = sorted(self._seq.keys() | set().union(*self._clients.values()))
+            if not active:
+                continue
+            carry += self.rate * elapsed  # by elapsed time, so sleep overshoot doesn't lower the rate
+            n, carry = int(carry), carry - int(carry)
+            if n:
+                self.sent += await self._broadcast("ticks", self._ticks(active, n, time.time_ns()))
+            if self.bar_interval and now - last_bar >= self.bar_interval:
+                bar_ts = time.time_ns()
+                bars = []
+                for sym in active:
+                    close = self._price.get(sym, 100.0)
+                    o = self._opens.get(sym, close)
+                    bars.append([sym, bar_ts, o, max(o, close), min(o, close), close, 0.0])
+                    self._opens[sym] = close
+                await self._broadcast("bars", bars)
+                last_bar = now
+
+    async def _disconnect_later(self, ws):
+        await asyncio.sleep(self.disconnect_every)
+        await ws.close(code=1012, reason="replay: injected disconnect")
+
+    async def _handler(self, ws):
+        symbols: Set[str] = set()
+        self._clients[ws] = symbols
+        killer = asyncio.create_task(self._disconnect_later(ws)) if self.disconnect_every else None
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                op, requested = msg.get("op"), msg.get("symbols", [])
+                if op == "subscribe":
+                    symbols.update(requested)
+                elif op == "unsubscribe":
+                    symbols.difference_update(requested)
+                await ws.send(json.dumps({"type": f"{op}d", "symbols": sorted(symbols)}))
+        except Exception:
+            pass
+        finally:
+            self._clients.pop(ws, None)
+            if killer is not None:
+                killer.cancel()
+
+    async def start(self):
+        from websockets.asyncio.server import serve
+        self._server = await serve(self._handler, self.host, self.port, compression=None, max_size=None)
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+        self._market = asyncio.create_task(self._run_market())
+        return self
+
+    async def stop(self):
+        if self._market is not None:
+            self._market.cancel()
+            self._market = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+if __name__ == "__main__":
+    # Offline throughput test: replay server -> feed -> ring buffer -> consumer
+    parser = argparse.ArgumentParser(description="Replay-server ingestion benchmark")
+    parser.add_argument("--rate", type=float, default=50_000, help="Ticks per second")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--per-connection", type=int, default=20, help="Symbols multiplexed per connection")
+    parser.add_argument("--gap-every", type=int, default=0)
+    parser.add_argument("--disconnect-every", type=float, default=0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    async def _bench():
+        server = await ReplayServer(port=0, rate=args.rate, gap_every=args.gap_every, disconnect_every=args.disconnect_every).start()
+        feed = StreamingFeed(ReplayAdapter(server.url, max_streams=args.per_connection), reconnect_backoff=0.1)
+        symbols = [f"SYM{i}/USDT" for i in range(args.symbols)]
+        await feed.start(symbols)
+        await feed.wait_connected()
+
+        consumed, cursor = 0, feed.ticks.head
+
+        async def consumer():
+            nonlocal consumed, cursor
+            while True:
+                await feed.ticks.wait(cursor)
+                chunks, cursor, lost = feed.ticks.read(cursor)
+                consumed += sum(len(c) for c in chunks)
+
+        task = asyncio.create_task(consumer())
+        cpu, wall = time.process_time(), time.perf_counter()
+        await asyncio.sleep(args.seconds)
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+        task.cancel()
+        await feed.stop()
+        await server.stop()
+        stats = feed.stats()
+        print(f"ingested {stats['ticks']} ticks in {wall:.1f}s = {stats['ticks'] / wall:,.0f} ticks/s "
+              f"(consumed {consumed}); process CPU {cpu / wall:.0%} of one core, shared with the server")
+        print({k: stats[k] for k in ("connections", "messages", "reconnects", "gaps", "missing", "duplicates")})
+
+    asyncio.run(_bench())
@@ -0,0 +1,426 @@
+"""
+Bot process supervisor.
+
+Runs the trading bot as one or more supervised worker processes:
+- PID tracking per worker, no pkill/taskkill
+- Heartbeat through shared memory; a stale heartbeat counts as a hang
+- Graceful stop: drain signal -> wait -> SIGTERM -> SIGKILL
+- Restart with exponential backoff, reset after a stable run
+- Per-worker resource stats via psutil
+
+Workers are forked from a forkserver that has already imported the heavy
+libraries (BOT_PRELOAD), so a (re)start costs a fork instead of re-importing
+pandas/ccxt. Platforms without fork fall back to spawn.
+
+A worker entrypoint is "module:function" (BOT_ENTRYPOINT, default
+"main_bot:main", so the bot module must be importable from the API's working
+directory or PYTHONPATH). The function receives a WorkerContext, may be sync
+or async, and should return once `ctx.draining` is set:
+
+    def main(ctx):
+        while not ctx.draining:
+            run_one_cycle()
+            ctx.heartbeat()
+
+An entrypoint without ":" ("main_bot" or "path/to/main_bot.py") runs as a
+plain script, like the old `python main_bot.py`: a drain request interrupts
+it with KeyboardInterrupt, and only the background heartbeat is available,
+so a hung script is caught by its exit, not by a stale beat.
+"""
+import os
+import sys
+import time
+import signal
+import asyncio
+import logging
+import runpy
+import _thread
+import importlib
+import threading
+import multiprocessing
+from typing import Dict, List, Optional
+from src.python.utils.config_store import RuntimeConfig, config_store
+
+try:
+    import psutil
+except ImportError:  # stats degrade to pid/uptime only
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+BOT_ENTRYPOINT = os.getenv("BOT_ENTRYPOINT", "main_bot:main")
+BOT_WORKERS = [w for w in os.getenv("BOT_WORKERS", "main").split(",") if w]
+BOT_PRELOAD = [m for m in os.getenv("BOT_PRELOAD", "numpy,pandas,ccxt,pandas_market_calendars").split(",") if m]
+BOT_HEARTBEAT_INTERVAL = float(os.getenv("BOT_HEARTBEAT_INTERVAL", 1))
+BOT_HEARTBEAT_TIMEOUT = float(os.getenv("BOT_HEARTBEAT_TIMEOUT", 30))
+BOT_DRAIN_TIMEOUT = float(os.getenv("BOT_DRAIN_TIMEOUT", 15))
+BOT_TERM_TIMEOUT = float(os.getenv("BOT_TERM_TIMEOUT", 5))
+BOT_RESTART_BACKOFF = float(os.getenv("BOT_RESTART_BACKOFF", 1))
+BOT_RESTART_BACKOFF_MAX = float(os.getenv("BOT_RESTART_BACKOFF_MAX", 60))
+BOT_STABLE_AFTER = float(os.getenv("BOT_STABLE_AFTER", 60))  # uptime that resets the backoff
+BOT_MONITOR_INTERVAL = 0.5
+
+
+def get_mp_context():
+    """Forkserver with preloaded imports where available, spawn otherwise."""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(BOT_PRELOAD)
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+def warm_forkserver():
+    """Starts the forkserver now so its imports are paid before the first /bot/start."""
+    ctx = get_mp_context()
+    if ctx.get_start_method() == "forkserver":
+        from multiprocessing import forkserver
+        started = time.perf_counter()
+        forkserver.ensure_running()
+        # Preloading continues inside the forkserver; the first fork waits for it
+        logger.info(f"Bot forkserver started in {(time.perf_counter() - started) * 1000:.0f}ms (preload: {BOT_PRELOAD})")
+
+
+class WorkerContext:
+    """Child-side handle: drain flag, heartbeat and live config."""
+
+    def __init__(self, name: str, drain_event, heartbeat_value, config_version):
+        self.name = name
+        self._drain = drain_event
+        self._heartbeat = heartbeat_value
+        self._config_version = config_version
+        self._seen_version = config_version.value
+        self.reports_progress = False  # set once the entrypoint beats by itself
+
+    @property
+    def draining(self) -> bool:
+        return self._drain.is_set()
+
+    def wait(self, timeout: float) -> bool:
+        """Sleeps up to timeout; returns True early when a drain is requested."""
+        return self._drain.wait(timeout)
+
+    def heartbeat(self):
+        self.reports_progress = True
+        self._heartbeat.value = time.time()
+
+    @property
+    def config(self) -> RuntimeConfig:
+        """Live runtime config; the file is re-read only after the supervisor announces a change."""
+        version = self._config_version.value
+        if version != self._seen_version:
+            self._seen_version = version
+            config_store.load()
+        return config_store.current
+
+
+def _resolve(entrypoint: str):
+    module_name, _, func_name = entrypoint.partition(":")
+    return getattr(importlib.import_module(module_name), func_name or "main")
+
+
+def _run_script(entrypoint: str, drain_event):
+    """Script-mode entrypoint: runs it as __main__ and turns a drain request into KeyboardInterrupt."""
+    def _interrupt():
+        drain_event.wait()
+        _thread.interrupt_main()
+
+    threading.Thread(target=_interrupt, daemon=True).start()
+    try:
+        if entrypoint.endswith(".py"):
+            runpy.run_path(entrypoint, run_name="__main__")
+        else:
+            runpy.run_module(entrypoint, run_name="__main__", alter_sys=True)
+    except KeyboardInterrupt:
+        if not drain_event.is_set():
+            raise
+
+
+def _worker_main(name: str, entrypoint: str, drain_event, heartbeat_value, config_version):
+    """Child process body."""
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s [{name}] %(levelname)s %(message)s")
+    config_store.load()
+    ctx = WorkerContext(name, drain_event, heartbeat_value, config_version)
+    heartbeat_value.value = time.time()
+    # SIGTERM from the supervisor becomes a drain request first
+    signal.signal(signal.SIGTERM, lambda *_: drain_event.set())
+
+    # Background beats until the entrypoint calls ctx.heartbeat() itself; from then
+    # on a stuck strategy loop shows up as a stale heartbeat, not just a dead process
+    stop_beats = threading.Event()
+
+    def _beat():
+        while not stop_beats.wait(BOT_HEARTBEAT_INTERVAL) and not ctx.reports_progress:
+            heartbeat_value.value = time.time()
+
+    threading.Thread(target=_beat, daemon=True).start()
+    try:
+        if ":" not in entrypoint:
+            _run_script(entrypoint, drain_event)
+            return
+        result = _resolve(entrypoint)(ctx)
+        if asyncio.iscoroutine(result):
+            asyncio.run(result)
+    finally:
+        stop_beats.set()
+
+
+class Worker:
+    """Parent-side record of one supervised worker."""
+
+    def __init__(self, name: str, entrypoint: str):
+        self.name = name
+        self.entrypoint = entrypoint
+        self.process = None
+        self.drain_event = None
+        self.heartbeat = None
+        self.started_at: Optional[float] = None
+        self.restarts = 0
+        self.failures = 0  # consecutive, drives the backoff
+        self.next_start: Optional[float] = None
+        self.last_exit: Optional[int] = None
+        self.wanted = False  # should be running
+        self._ps = None
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process is not None else None
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def heartbeat_age(self) -> Optional[float]:
+        return time.time() - self.heartbeat.value if self.heartbeat is not None and self.alive() else None
+
+    def spawn(self, ctx, config_version):
+        self.drain_event = ctx.Event()
+        self.heartbeat = ctx.Value("d", time.time(), lock=False)
+        self.process = ctx.Process(target=_worker_main, name=f"bot-{self.name}",
+                                   args=(self.name, self.entrypoint, self.drain_event, self.heartbeat,
+                                         config_version),
+                                   daemon=False)
+        self.process.start()
+        self.started_at = time.time()
+        self.next_start = None
+        self._ps = psutil.Process(self.process.pid) if psutil else None
+        logger.info(f"Bot worker {self.name} started (pid {self.process.pid})")
+
+    def stats(self) -> dict:
+        info = {
+            "name": self.name, "pid": self.pid, "alive": self.alive(), "wanted": self.wanted,
+            "uptime": round(time.time() - self.started_at, 1) if self.alive() and self.started_at else 0,
+            "restarts": self.restarts, "last_exit": self.last_exit,
+            "heartbeat_age": round(self.heartbeat_age(), 2) if self.heartbeat_age() is not None else None,
+            "next_start_in": round(max(0.0, self.next_start - time.time()), 1) if self.next_start else None,
+        }
+        if self._ps is not None and self.alive():
+            try:
+                with self._ps.oneshot():
+                    info.update({
+                        "cpu_percent": self._ps.cpu_percent(),
+                        "rss_mb": round(self._ps.memory_info().rss / 1e6, 1),
+                        "threads": self._ps.num_threads(),
+                    })
+            except psutil.Error:
+                pass
+        return info
+
+
+class BotSupervisor:
+    """Owns the bot workers; all methods run on the API event loop."""
+
+    def __init__(self, workers: Optional[List[str]] = None, entrypoint: str = BOT_ENTRYPOINT):
+        self.ctx = get_mp_context()
+        self.workers: Dict[str, Worker] = {name: Worker(name, entrypoint) for name in workers or BOT_WORKERS}
+        self._monitor: Optional[asyncio.Task] = None
+        self._config_version = None  # shared with all workers, created on first spawn
+        config_store.subscribe(self._on_config_change)
+
+    def _shared_config_version(self):
+        if self._config_version is None:
+            self._config_version = self.ctx.Value("q", config_store.version, lock=False)
+        return self._config_version
+
+    def _on_config_change(self, old, new, changed):
+        # Workers see the bump on their next ctx.config read and reload the file once
+        if self._config_version is not None:
+            self._config_version.value = config_store.version
+
+    def _ensure_monitor(self):
+        if self._monitor is None or self._monitor.done():
+            self._monitor = asyncio.create_task(self._watch())
+
+    def _select(self, name: Optional[str]) -> List[Worker]:
+        if name is None:
+            return list(self.workers.values())
+        if name not in self.workers:
+            raise KeyError(f"Unknown bot worker: {name}")
+        return [self.workers[name]]
+
+    async def start(self, name: Optional[str] = None) -> List[dict]:
+        for worker in self._select(name):
+            worker.wanted = True
+            worker.failures = 0
+            if not worker.alive():
+                await asyncio.to_thread(worker.spawn, self.ctx, self._shared_config_version())
+        self._ensure_monitor()
+        return self.status(name)
+
+    async def _stop_worker(self, worker: Worker, drain_timeout: float):
+        worker.wanted = False
+        worker.next_start = None
+        if not worker.alive():
+            return
+        pid = worker.pid
+        # 1. drain: the entrypoint finishes its cycle and returns
+        worker.drain_event.set()
+        if not await self._wait_exit(worker, drain_timeout):
+            # 2. SIGTERM, then 3. SIGKILL
+            logger.warning(f"Bot worker {worker.name} (pid {pid}) did not drain in {drain_timeout}s, terminating")
+            worker.process.terminate()
+            if not await self._wait_exit(worker, BOT_TERM_TIMEOUT):
+                worker.process.kill()
+                await self._wait_exit(worker, BOT_TERM_TIMEOUT)
+        worker.last_exit = worker.process.exitcode
+        logger.info(f"Bot worker {worker.name} (pid {pid}) stopped, exit code {worker.last_exit}")
+
+    @staticmethod
+    async def _wait_exit(worker: Worker, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while worker.process.is_alive():
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        worker.process.join(0)
+        return True
+
+    async def stop(self, name: Optional[str] = None, drain_timeout: float = BOT_DRAIN_TIMEOUT) -> List[dict]:
+        """Graceful drain-then-stop; restarts are disabled until the next start."""
+        await asyncio.gather(*[self._stop_worker(w, drain_timeout) for w in self._select(name)])
+        return self.status(name)
+
+    async def kill(self, name: Optional[str] = None) -> List[dict]:
+        """Immediate SIGKILL of our own worker PIDs only."""
+        for worker in self._select(name):
+            worker.wanted = False
+            worker.next_start = None
+            if worker.alive():
+                logger.warning(f"Killing bot worker {worker.name} (pid {worker.pid})")
+                worker.process.kill()
+        for worker in self._select(name):
+            if worker.process is not None:
+                await self._wait_exit(worker, BOT_TERM_TIMEOUT)
+                worker.last_exit = worker.process.exitcode
+        return self.status(name)
+
+    async def restart(self, name: Optional[str] = None) -> List[dict]:
+        await self.stop(name)
+        return await self.start(name)
+
+    def _schedule_restart(self, worker: Worker, reason: str):
+        uptime = time.time() - (worker.started_at or time.time())
+        worker.failures = 1 if uptime >= BOT_STABLE_AFTER else worker.failures + 1
+        delay = min(BOT_RESTART_BACKOFF * 2 ** (worker.failures - 1), BOT_RESTART_BACKOFF_MAX)
+        worker.next_start = time.time() + delay
+        logger.warning(f"Bot worker {worker.name} {reason}; restarting in {delay:.1f}s")
+
+    async def _watch(self):
+        while any(w.wanted for w in self.workers.values()):
+            for worker in self.workers.values():
+                if not worker.wanted:
+                    continue
+                if worker.process is not None and not worker.alive() and worker.next_start is None:
+                    worker.process.join(0)
+                    worker.last_exit = worker.process.exitcode
+                    self._schedule_restart(worker, f"exited with code {worker.last_exit}")
+                elif worker.alive() and (age := worker.heartbeat_age()) is not None and age > BOT_HEARTBEAT_TIMEOUT:
+                    worker.process.kill()
+                    await self._wait_exit(worker, BOT_TERM_TIMEOUT)
+                    worker.last_exit = worker.process.exitcode
+                    self._schedule_restart(worker, f"missed heartbeats for {BOT_HEARTBEAT_TIMEOUT}s")
+                elif worker.next_start is not None and time.time() >= worker.next_start:
+                    worker.restarts += 1
+                    try:
+                        await asyncio.to_thread(worker.spawn, self.ctx, self._shared_config_version())
+                    except Exception as e:
+                        logger.error(f"Bot worker {worker.name} failed to start: {e}")
+                        self._schedule_restart(worker, "failed to start")
+            await asyncio.sleep(BOT_MONITOR_INTERVAL)
+
+    @property
+    def running(self) -> bool:
+        return any(w.alive() for w in self.workers.values())
+
+    def status(self, name: Optional[str] = None) -> List[dict]:
+        return [w.stats() for w in self._select(name)]
+
+    async def shutdown(self):
+        """API shutdown: drain every worker and stop supervising."""
+        await self.stop()
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+
+
+# Global supervisor instance
+bot_supervisor = BotSupervisor()
+
+
+if __name__ == "__main__":
+    # Self-test with a throwaway entrypoint written to a temp dir
+    import tempfile
+    logging.basicConfig(level=logging.INFO)
+    tmp = tempfile.mkdtemp()
+    with open(os.path.join(tmp, "demo_bot.py"), "w") as f:
+        f.write(
+            "import time\n"
+            "def main(ctx):\n"
+            "    while not ctx.wait(0.1):\n"
+            "        ctx.heartbeat()\n"
+            "def crash(ctx):\n"
+            "    time.sleep(0.2)\n"
+            "    raise SystemExit(3)\n"
+        )
+    with open(os.path.join(tmp, "demo_script.py"), "w") as f:
+        f.write(
+            "import time\n"
+            "if __name__ == '__main__':\n"
+            "    while True:\n"
+            "        time.sleep(0.1)\n"
+        )
+    sys.path.insert(0, tmp)
+
+    async def _demo():
+        started = time.perf_counter()
+        await asyncio.to_thread(warm_forkserver)
+        print(f"forkserver warm: {(time.perf_counter() - started) * 1000:.0f}ms")
+
+        sup = BotSupervisor(workers=["a", "b"], entrypoint="demo_bot:main")
+        started = time.perf_counter()
+        await sup.start()
+        print(f"2 workers up: {(time.perf_counter() - started) * 1000:.0f}ms")
+        await asyncio.sleep(1.5)
+        for s in sup.status():
+            print(s)
+        started = time.perf_counter()
+        await sup.stop()
+        print(f"drained: {(time.perf_counter() - started) * 1000:.0f}ms", [s["last_exit"] for s in sup.status()])
+        started = time.perf_counter()
+        await sup.start()
+        print(f"warm restart of 2 workers: {(time.perf_counter() - started) * 1000:.0f}ms")
+        await sup.stop()
+
+        crashy = BotSupervisor(workers=["c"], entrypoint="demo_bot:crash")
+        await crashy.start()
+        await asyncio.sleep(4)
+        print("crash loop:", crashy.status()[0]["restarts"], "restarts")
+        await crashy.shutdown()
+
+        script = BotSupervisor(workers=["d"], entrypoint="demo_script")
+        await script.start()
+        await asyncio.sleep(0.5)
+        started = time.perf_counter()
+        await script.stop()
+        print(f"script drained: {(time.perf_counter() - started) * 1000:.0f}ms", script.status()[0]["last_exit"])
+
+    asyncio.run(_demo())
@@ -0,0 +1,173 @@
+"""
+Hot-reloadable runtime config.
+
+The live config is one immutable RuntimeConfig held by `config_store.current`;
+reading a field is a plain attribute load, no env or disk access. Updates are
+validated, versioned and persisted with a single atomic file replace, then
+swapped in and announced to subscribers (bot supervisor, calendar, risk).
+
+    from src.python.utils.config_store import config_store
+    config_store.current.exchange_name
+    config_store.update(risk_limit=1.5)
+    config_store.subscribe(on_change, keys=("risk_limit", "max_drawdown"))
+"""
+import os
+import json
+import logging
+import tempfile
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DIR = os.getenv('CONFIG_DIR', 'config')
+CONFIG_STORE_FILE = os.getenv('CONFIG_STORE_FILE', os.path.join(CONFIG_DIR, 'runtime_config.json'))
+
+
+class RuntimeConfig(NamedTuple):
+    exchange_type: str = "crypto"
+    exchange_name: str = "Binance"
+    risk_limit: float = 2.0
+    max_drawdown: float = 20.0
+    strategy_mode: str = "hybrid"
+
+
+# Env names that seeded these settings before the store existed (.env compatibility)
+ENV_KEYS = {
+    "exchange_type": "EXCHANGE_TYPE",
+    "exchange_name": "EXCHANGE_NAME",
+    "risk_limit": "RISK_LIMIT",
+    "max_drawdown": "MAX_DRAWDOWN",
+    "strategy_mode": "STRATEGY_MODE",
+}
+
+Subscriber = Callable[[RuntimeConfig, RuntimeConfig, Tuple[str, ...]], None]
+
+
+class ConfigConflict(Exception):
+    """Raised when an update was based on an older version."""
+
+
+def _coerce(values: dict) -> dict:
+    """Casts values to the RuntimeConfig field types; unknown keys are rejected."""
+    types = RuntimeConfig.__annotations__
+    unknown = set(values) - set(types)
+    if unknown:
+        raise ValueError(f"Unknown config keys: {sorted(unknown)}")
+    coerced = {key: types[key](value) for key, value in values.items()}
+    if "exchange_type" in coerced:
+        coerced["exchange_type"] = coerced["exchange_type"].lower()
+    for key in ("risk_limit", "max_drawdown"):
+        if key in coerced and coerced[key] < 0:
+            raise ValueError(f"{key} must be >= 0")
+    return coerced
+
+
+def _from_env() -> RuntimeConfig:
+    try:
+        return RuntimeConfig(**_coerce({k: os.environ[env] for k, env in ENV_KEYS.items() if env in os.environ}))
+    except ValueError as e:
+        logger.error(f"Invalid config in environment: {e}. Using defaults.")
+        return RuntimeConfig()
+
+
+class ConfigStore:
+    def __init__(self, path: str = CONFIG_STORE_FILE):
+        self.path = path
+        # Readers only ever see a complete config: the reference is swapped, never mutated
+        self.current: RuntimeConfig = _from_env()
+        self.version = 0
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+        self._subscribers: List[Tuple[Subscriber, Optional[frozenset]]] = []
+
+    def load(self) -> RuntimeConfig:
+        """Reads the persisted config once (startup / after an external change)."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self._mtime = os.path.getmtime(self.path)
+            loaded = self.current._replace(**_coerce(data.get("config", {})))
+        except FileNotFoundError:
+            # First run: keep the env-seeded values; the first update creates the file
+            from dotenv import load_dotenv
+            load_dotenv()
+            self._apply(_from_env(), self.version)
+            return self.current
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read {self.path}: {e}. Keeping current config.")
+            return self.current
+        self._apply(loaded, int(data.get("version", 0)))
+        return self.current
+
+    def reload_if_changed(self) -> bool:
+        """Cheap stat check for other processes (bot workers) sharing the file."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self.load()
+        return True
+
+    def update(self, expected_version: Optional[int] = None, **changes) -> RuntimeConfig:
+        """
+        Validates, persists (one write) and publishes a new version.
+        With expected_version the update fails if someone else saved first.
+        """
+        with self._lock:
+            if expected_version is not None and expected_version != self.version:
+                raise ConfigConflict(f"Config is at version {self.version}, not {expected_version}")
+            new = self.current._replace(**_coerce(changes))
+            if new == self.current:
+                return self.current
+            self._persist(new, self.version + 1)
+            self._apply(new, self.version + 1)
+        return new
+
+    def override(self, **changes) -> RuntimeConfig:
+        """In-memory change without persisting (scripts, self-tests); subscribers still fire."""
+        with self._lock:
+            self._apply(self.current._replace(**_coerce(changes)), self.version)
+        return self.current
+
+    def _persist(self, config: RuntimeConfig, version: int):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".runtime_config.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": version, "config": config._asdict()}, f, indent=2)
+            os.replace(tmp, self.path)  # atomic: readers see the old or the new file
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self._mtime = os.path.getmtime(self.path)
+
+    def _apply(self, new: RuntimeConfig, version: int):
+        old, self.current, self.version = self.current, new, version
+        changed = tuple(k for k in RuntimeConfig._fields if getattr(old, k) != getattr(new, k))
+        if not changed:
+            return
+        logger.info(f"Config v{version}: {', '.join(f'{k}={getattr(new, k)}' for k in changed)}")
+        for callback, keys in list(self._subscribers):
+            if keys is None or keys.intersection(changed):
+                try:
+                    callback(old, new, changed)
+                except Exception as e:
+                    logger.error(f"Config subscriber {getattr(callback, '__qualname__', callback)} failed: {e}")
+
+    def subscribe(self, callback: Subscriber, keys: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """Calls callback(old, new, changed_keys) after each change touching `keys`; returns an unsubscribe."""
+        entry = (callback, frozenset(keys) if keys else None)
+        self._subscribers.append(entry)
+        return lambda: self._subscribers.remove(entry) if entry in self._subscribers else None
+
+    def snapshot(self) -> Dict:
+        return {"version": self.version, **self.current._asdict()}
+
+
+# Global store instance
+config_store = ConfigStore()
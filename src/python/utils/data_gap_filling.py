@@ -0,0 +1,204 @@
+"""
+Calendar-aware gap detection and filling for OHLCV bars.
+
+The expected bar grid comes from the market calendar sessions
+(market_calendar.get_sessions): a bar is expected at every timeframe step
+inside a session, so nights, weekends, holidays and lunch breaks are never
+reported as gaps, while 24/7 crypto sessions expect every step. Bars are
+columns of numpy arrays (as returned by BarStore.read(...).to_numpy()) with
+int64 UTC nanosecond `ts` = bar open time.
+
+    gaps = find_gaps(bars['ts'], '1m', exchange='NYSE', asset_type='stock')
+    bars, gaps = fill_gaps(bars, '1m', method='interpolate', max_fill=5)
+
+Synthetic bars are flat (open = high = low = close) with zero volume and
+`filled=True`. StreamingGapFiller does the same across successive chunks
+of live bars.
+"""
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from src.python.data.ccxt_integration import timeframe_to_ms
+from src.python.utils.market_calendar import NS_PER_DAY, get_sessions
+
+logger = logging.getLogger(__name__)
+
+# One row per run of consecutive missing grid bars: [start, end), how many bars, and
+# whether fill_gaps() filled it
+GAP_DTYPE = np.dtype([('start', 'i8'), ('end', 'i8'), ('missing', 'i8'), ('filled', '?')])
+FILL_METHODS = ('none', 'ffill', 'interpolate')
+OHLC = ('open', 'high', 'low', 'close')
+
+
+def timeframe_ns(timeframe) -> int:
+    return timeframe_to_ms(timeframe) * 1_000_000 if isinstance(timeframe, str) else int(timeframe)
+
+
+def _day(ns: int) -> str:
+    return str(np.datetime64(int(ns), 'ns').astype('datetime64[D]'))
+
+
+def session_grid(start_ns: int, end_ns: int, timeframe, exchange: Optional[str] = None,
+                 asset_type: Optional[str] = None, align: str = 'epoch') -> np.ndarray:
+    """
+    Expected bar open times in [start_ns, end_ns], restricted to sessions.
+    align='epoch' puts bars on multiples of the timeframe (exchange/ccxt
+    style); align='session' counts from each session open (9:30, 10:30 ...).
+    """
+    step = timeframe_ns(timeframe)
+    # Start a day early: a session that opened yesterday (UTC) may still be running
+    opens, closes = get_sessions(_day(start_ns - NS_PER_DAY), _day(end_ns), exchange, asset_type)
+    lo = np.maximum(opens, start_ns)
+    hi = np.minimum(closes, end_ns + 1)  # bars open strictly before the close
+    if align == 'session':
+        first = opens + -(-(lo - opens) // step) * step
+    else:
+        first = -(-lo // step) * step
+    counts = np.maximum(-(-(hi - first) // step), 0)
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    # Vectorized concat of per-session aranges
+    run_starts = np.cumsum(counts) - counts
+    offsets = np.arange(total) - np.repeat(run_starts, counts)
+    return np.repeat(first, counts) + offsets * step
+
+
+def _missing(ts: np.ndarray, grid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Grid points absent from sorted `ts`, plus a run id per point (one run per gap)."""
+    if len(ts) == 0:
+        return grid, np.zeros(len(grid), dtype=np.int64)
+    pos = np.searchsorted(ts, grid)
+    present = ts[np.minimum(pos, len(ts) - 1)] == grid
+    idx = np.flatnonzero(~present)
+    # Consecutive grid slots form one gap, even across a session boundary
+    run = np.concatenate([[0], np.cumsum(np.diff(idx) != 1)]) if len(idx) else idx
+    return grid[idx], run
+
+
+def _gaps(missing: np.ndarray, run: np.ndarray, step: int) -> np.ndarray:
+    if len(missing) == 0:
+        return np.empty(0, dtype=GAP_DTYPE)
+    starts = np.flatnonzero(np.r_[True, run[1:] != run[:-1]])
+    ends = np.r_[starts[1:], len(missing)] - 1
+    gaps = np.empty(len(starts), dtype=GAP_DTYPE)
+    gaps['start'] = missing[starts]
+    gaps['end'] = missing[ends] + step
+    gaps['missing'] = ends - starts + 1
+    gaps['filled'] = False
+    return gaps
+
+
+def find_gaps(ts: np.ndarray, timeframe, exchange: Optional[str] = None, asset_type: Optional[str] = None,
+              align: str = 'epoch', start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+    """
+    Runs of expected-but-absent bars between `start` and `end` (default: the
+    first and last bar present). `ts` must be sorted and unique.
+    """
+    ts = np.asarray(ts, dtype=np.int64)
+    if len(ts) == 0 and (start is None or end is None):
+        return np.empty(0, dtype=GAP_DTYPE)
+    start = int(ts[0]) if start is None else start
+    end = int(ts[-1]) if end is None else end
+    step = timeframe_ns(timeframe)
+    missing, run = _missing(ts, session_grid(start, end, step, exchange, asset_type, align))
+    return _gaps(missing, run, step)
+
+
+def fill_gaps(bars: Dict[str, np.ndarray], timeframe, exchange: Optional[str] = None,
+              asset_type: Optional[str] = None, method: str = 'ffill', max_fill: Optional[int] = None,
+              align: str = 'epoch', start: Optional[int] = None,
+              end: Optional[int] = None) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    Inserts synthetic bars for missing grid slots. 'ffill' repeats the
+    previous close, 'interpolate' draws a straight line between the closes
+    around the gap. Gaps longer than `max_fill` bars are left open. Returns
+    the merged columns (sorted, with a `filled` flag per bar) and every gap
+    found (`gaps['filled']` tells which were filled).
+    """
+    if method not in FILL_METHODS:
+        raise ValueError(f"Unknown fill method {method!r}; expected one of {FILL_METHODS}")
+    ts = np.asarray(bars['ts'], dtype=np.int64)
+    step = timeframe_ns(timeframe)
+    out = dict(bars)
+    out.setdefault('filled', np.zeros(len(ts), dtype=bool))
+    if len(ts) == 0:
+        return out, np.empty(0, dtype=GAP_DTYPE)
+
+    start = int(ts[0]) if start is None else start
+    end = int(ts[-1]) if end is None else end
+    missing, run = _missing(ts, session_grid(start, end, step, exchange, asset_type, align))
+    gaps = _gaps(missing, run, step)
+    if method == 'none' or len(missing) == 0:
+        return out, gaps
+
+    # Only gaps with a real bar before them (and after, for interpolation) and short enough
+    sizes = gaps['missing'][run]
+    prev = np.searchsorted(ts, missing) - 1
+    fillable = prev >= 0
+    if method == 'interpolate':
+        fillable &= prev + 1 < len(ts)
+    if max_fill is not None:
+        fillable &= sizes <= max_fill
+    fill_ts = missing[fillable]
+    close = np.asarray(bars['close'], dtype=np.float64)
+    if method == 'ffill':
+        values = close[prev[fillable]]
+    else:
+        # Relative offsets keep the interpolation weights exact at ns scale
+        values = np.interp((fill_ts - ts[0]).astype(np.float64), (ts - ts[0]).astype(np.float64), close)
+
+    synthetic = {'ts': fill_ts, 'volume': np.zeros(len(fill_ts)), 'filled': np.ones(len(fill_ts), dtype=bool)}
+    for name in OHLC:
+        synthetic[name] = values
+    order = np.argsort(np.concatenate([ts, fill_ts]), kind='stable')
+    for name, column in out.items():
+        column = np.asarray(column)
+        extra = synthetic.get(name)
+        if extra is None:  # unknown columns: NaN for floats, zero otherwise
+            extra = np.full(len(fill_ts), np.nan if column.dtype.kind == 'f' else 0, dtype=column.dtype)
+        out[name] = np.concatenate([column, np.asarray(extra, dtype=column.dtype)])[order]
+
+    gaps['filled'] = fillable[np.flatnonzero(np.r_[True, run[1:] != run[:-1]])]
+    return out, gaps
+
+
+class StreamingGapFiller:
+    """
+    Gap filling for live bars arriving in chunks (sorted, newer than anything
+    seen). A gap is detected, and filled, when the first bar after it arrives.
+    """
+
+    def __init__(self, timeframe, exchange: Optional[str] = None, asset_type: Optional[str] = None,
+                 method: str = 'ffill', max_fill: Optional[int] = None, align: str = 'epoch'):
+        self.timeframe = timeframe_ns(timeframe)
+        self.exchange = exchange
+        self.asset_type = asset_type
+        self.method = method
+        self.max_fill = max_fill
+        self.align = align
+        self._last: Optional[Dict[str, np.ndarray]] = None  # previous chunk's last bar
+        self.counters = {'gaps': 0, 'missing': 0, 'filled': 0}
+
+    def process(self, bars: Dict[str, np.ndarray]) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        if len(bars['ts']) == 0:
+            out = dict(bars)
+            out.setdefault('filled', np.zeros(0, dtype=bool))
+            return out, np.empty(0, dtype=GAP_DTYPE)
+        bars = dict(bars)
+        bars.setdefault('filled', np.zeros(len(bars['ts']), dtype=bool))
+        carried = self._last is not None
+        if carried:
+            # Prepend the previous bar so gaps at the chunk boundary are seen and filled
+            bars = {name: np.concatenate([self._last[name], np.asarray(col)]) for name, col in bars.items()}
+        out, gaps = fill_gaps(bars, self.timeframe, self.exchange, self.asset_type, self.method,
+                              self.max_fill, self.align)
+        if carried:
+            out = {name: col[1:] for name, col in out.items()}
+        self.counters['gaps'] += len(gaps)
+        self.counters['missing'] += int(gaps['missing'].sum())
+        self.counters['filled'] += int(gaps['missing'][gaps['filled']].sum())
+        self._last = {name: col[-1:] for name, col in out.items()}
+        return out, gaps
@@ -0,0 +1,196 @@
+"""
+Shared async connection pools (TimescaleDB via asyncpg, Redis via redis.asyncio)
+and the health probes that report on them.
+
+The API creates the pools once in its lifespan (`pools.start(...)`); modules
+take connections from here instead of opening their own clients. Either
+backend may be unreachable at startup: the API still boots, /health reports
+it, and the Postgres pool is retried on the next probe.
+"""
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", 1))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", 10))
+REDIS_POOL_MAX = int(os.getenv("REDIS_MAX_CONNECTIONS", 20))
+POOL_CONNECT_TIMEOUT = float(os.getenv("POOL_CONNECT_TIMEOUT", 2))
+POOL_CHECKOUT_TIMEOUT = float(os.getenv("POOL_CHECKOUT_TIMEOUT", 1))  # wait for a free connection
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", 1))
+HEALTH_CACHE_TTL = float(os.getenv("HEALTH_CACHE_TTL", 2))
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+class ConnectionPools:
+    def __init__(self):
+        self.database_url: Optional[str] = None
+        self.redis_url: Optional[str] = None
+        self.pg = None     # asyncpg.Pool
+        self.redis = None  # redis.asyncio.Redis on a BlockingConnectionPool
+        self._pg_lock = asyncio.Lock()
+
+    async def start(self, database_url: Optional[str] = None, redis_url: Optional[str] = None):
+        self.database_url, self.redis_url = database_url, redis_url
+        if redis_url:
+            import redis.asyncio as aioredis
+            # Blocking pool: a burst waits up to POOL_CHECKOUT_TIMEOUT for a connection
+            # instead of failing, and the wait shows up as checkout latency
+            pool = aioredis.BlockingConnectionPool.from_url(
+                redis_url, max_connections=REDIS_POOL_MAX, timeout=POOL_CHECKOUT_TIMEOUT,
+                socket_connect_timeout=POOL_CONNECT_TIMEOUT, socket_timeout=HEALTH_PROBE_TIMEOUT,
+            )
+            self.redis = aioredis.Redis(connection_pool=pool)
+        if database_url:
+            await self._ensure_pg()
+
+    async def _ensure_pg(self):
+        if self.pg is not None or not self.database_url:
+            return self.pg
+        async with self._pg_lock:
+            if self.pg is None:
+                import asyncpg
+                try:
+                    self.pg = await asyncpg.create_pool(
+                        self.database_url, min_size=DB_POOL_MIN, max_size=DB_POOL_MAX,
+                        timeout=POOL_CONNECT_TIMEOUT, command_timeout=30,
+                    )
+                    logger.info(f"Postgres pool ready ({DB_POOL_MIN}-{DB_POOL_MAX} connections)")
+                except Exception as e:
+                    logger.error(f"Postgres pool unavailable: {e}")
+        return self.pg
+
+    async def close(self):
+        if self.pg is not None:
+            try:
+                await asyncio.wait_for(self.pg.close(), 5)
+            except Exception as e:
+                logger.warning(f"Postgres pool close failed: {e}")
+                self.pg.terminate()
+            self.pg = None
+        if self.redis is not None:
+            try:
+                await self.redis.aclose()
+                await self.redis.connection_pool.disconnect()
+            except Exception as e:
+                logger.warning(f"Redis pool close failed: {e}")
+            self.redis = None
+
+    def stats(self) -> Dict[str, Optional[dict]]:
+        """Pool occupancy without touching the network."""
+        out: Dict[str, Optional[dict]] = {"database": None, "redis": None}
+        if self.pg is not None:
+            size, idle, max_size = self.pg.get_size(), self.pg.get_idle_size(), self.pg.get_max_size()
+            out["database"] = {"size": size, "idle": idle, "in_use": size - idle, "max": max_size,
+                               "saturation": round((size - idle) / max_size, 3)}
+        if self.redis is not None:
+            pool = self.redis.connection_pool
+            in_use = len(getattr(pool, "_in_use_connections", ()))
+            idle = len(getattr(pool, "_available_connections", ()))
+            out["redis"] = {"size": in_use + idle, "idle": idle, "in_use": in_use, "max": pool.max_connections,
+                            "saturation": round(in_use / pool.max_connections, 3)}
+        return out
+
+    async def probe_database(self) -> dict:
+        if not self.database_url:
+            return {"status": "disabled"}
+        if await self._ensure_pg() is None:
+            return {"status": "down", "error": "pool unavailable"}
+        start = time.perf_counter()
+        async with self.pg.acquire(timeout=POOL_CHECKOUT_TIMEOUT) as conn:
+            checked_out = time.perf_counter()
+            await conn.fetchval("SELECT 1")
+            done = time.perf_counter()
+        return {"status": "up", "checkout_ms": _ms(checked_out - start), "rtt_ms": _ms(done - checked_out)}
+
+    async def probe_redis(self) -> dict:
+        if self.redis is None:
+            return {"status": "disabled"}
+        pool = self.redis.connection_pool
+        start = time.perf_counter()
+        conn = await pool.get_connection()
+        try:
+            checked_out = time.perf_counter()
+            await conn.send_command("PING")
+            await conn.read_response()
+            done = time.perf_counter()
+        finally:
+            await pool.release(conn)
+        return {"status": "up", "checkout_ms": _ms(checked_out - start), "rtt_ms": _ms(done - checked_out)}
+
+
+class HealthChecker:
+    """
+    Runs all probes concurrently, each under HEALTH_PROBE_TIMEOUT, and caches
+    the report for HEALTH_CACHE_TTL; concurrent callers share one probe run.
+    """
+
+    def __init__(self, pools: ConnectionPools, ttl: float = HEALTH_CACHE_TTL,
+                 timeout: float = HEALTH_PROBE_TIMEOUT):
+        self.pools = pools
+        self.ttl = ttl
+        self.timeout = timeout
+        self._report: Optional[dict] = None
+        self._expires_at = 0.0
+        self._inflight: Optional[asyncio.Future] = None
+
+    async def _probe(self, probe) -> dict:
+        try:
+            return await asyncio.wait_for(probe(), self.timeout)
+        except asyncio.TimeoutError:
+            return {"status": "down", "error": f"timeout after {self.timeout}s"}
+        except Exception as e:
+            return {"status": "down", "error": str(e) or type(e).__name__}
+
+    async def _run(self) -> dict:
+        started = time.perf_counter()
+        database, redis = await asyncio.gather(
+            self._probe(self.pools.probe_database),
+            self._probe(self.pools.probe_redis),
+        )
+        # Postgres is required; Redis only backs caches, so losing it degrades
+        if database["status"] == "down":
+            status = "unhealthy"
+        elif redis["status"] == "down":
+            status = "degraded"
+        else:
+            status = "healthy"
+        pool_stats = self.pools.stats()
+        database["pool"], redis["pool"] = pool_stats["database"], pool_stats["redis"]
+        return {
+            "status": status,
+            "services": {"api": {"status": "up"}, "database": database, "redis": redis},
+            "checked_at": time.time(),
+            "probe_ms": _ms(time.perf_counter() - started),
+        }
+
+    async def check(self) -> dict:
+        if self._report is not None and time.monotonic() < self._expires_at:
+            return {**self._report, "cached": True}
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._run())
+            self._inflight.add_done_callback(self._store)
+        report = await asyncio.shield(self._inflight)
+        return {**report, "cached": False}
+
+    def _store(self, future: asyncio.Future):
+        self._inflight = None
+        if not future.cancelled() and future.exception() is None:
+            self._report = future.result()
+            self._expires_at = time.monotonic() + self.ttl
+
+
+# Global instances
+pools = ConnectionPools()
+health_checker = HealthChecker(pools)
+
+
+def get_redis():
+    """Shared Redis client, or None before startup / when Redis is not configured."""
+    return pools.redis
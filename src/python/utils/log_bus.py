@@ -0,0 +1,112 @@
+import os
+import queue
+import logging
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+LOG_BUFFER_SIZE = int(os.getenv("LOG_BUFFER_SIZE", 1000))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+LOG_BUS_LEVEL = os.getenv("LOG_BUS_LEVEL", "INFO").upper()
+
+# Logger-name prefix -> category shown to clients (first match wins)
+CATEGORY_PREFIXES = (
+    ("src.python.utils.market_calendar", "calendar"),
+    ("src.python.data", "data"),
+    ("src.python.ai", "ai"),
+    ("routers", "api"),
+)
+CATEGORIES = ("calendar", "data", "ai", "api", "system")
+
+
+def categorize(logger_name: str) -> str:
+    for prefix, category in CATEGORY_PREFIXES:
+        if logger_name.startswith(prefix):
+            return category
+    return "system"
+
+
+class BusHandler(logging.Handler):
+    """
+    logging handler that hands records to the bus without ever blocking the
+    caller: a full queue drops the record and bumps a counter.
+    """
+
+    def __init__(self, bus: "LogBus", level: int = logging.INFO):
+        super().__init__(level)
+        self.bus = bus
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            entry = {
+                "type": "log",
+                "ts": record.created,
+                "level": record.levelname,
+                "levelno": record.levelno,
+                "category": categorize(record.name),
+                "logger": record.name,
+                "message": record.getMessage(),
+            }
+            self.bus.queue.put_nowait(entry)
+            self.bus.counters["emitted"] += 1
+        except queue.Full:
+            self.bus.counters["dropped"] += 1
+        except Exception:
+            self.handleError(record)
+
+
+class LogBus:
+    """
+    In-process log bus: a bounded hand-off queue filled by BusHandler from any
+    thread, drained by a consumer into a fixed-size ring buffer for replay.
+    """
+
+    def __init__(self, buffer_size: int = LOG_BUFFER_SIZE, queue_size: int = LOG_QUEUE_SIZE):
+        self.queue: "queue.Queue[dict]" = queue.Queue(maxsize=queue_size)
+        self.buffer: deque = deque(maxlen=buffer_size)
+        self.counters = {"emitted": 0, "dropped": 0, "drained": 0}
+        self._handler: Optional[BusHandler] = None
+
+    def install(self, logger_names: Iterable[str] = ("src.python", "routers"),
+                level: str = LOG_BUS_LEVEL) -> BusHandler:
+        """Attaches the bus handler to the given loggers (children propagate to it)."""
+        if self._handler is None:
+            self._handler = BusHandler(self, logging.getLevelName(level))
+        for name in logger_names:
+            target = logging.getLogger(name)
+            if self._handler not in target.handlers:
+                target.addHandler(self._handler)
+            if target.level == logging.NOTSET or target.level > self._handler.level:
+                target.setLevel(self._handler.level)
+        return self._handler
+
+    def drain(self, max_items: int = 1000) -> List[dict]:
+        """Moves queued entries into the ring buffer and returns them (consumer side)."""
+        entries = []
+        for _ in range(max_items):
+            try:
+                entries.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        self.buffer.extend(entries)
+        self.counters["drained"] += len(entries)
+        return entries
+
+    def recent(self, n: int = 100, min_level: int = logging.NOTSET,
+               categories: Optional[Iterable[str]] = None) -> List[dict]:
+        """Last n buffered entries matching the filter, oldest first."""
+        wanted = set(categories) if categories else None
+        matched = []
+        for entry in reversed(self.buffer):
+            if entry["levelno"] >= min_level and (wanted is None or entry["category"] in wanted):
+                matched.append(entry)
+                if len(matched) >= n:
+                    break
+        matched.reverse()
+        return matched
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "queued": self.queue.qsize(), "buffered": len(self.buffer)}
+
+
+# Global bus instance
+log_bus = LogBus()
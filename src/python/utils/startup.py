@@ -0,0 +1,154 @@
+"""
+Startup phases, readiness flag and the warmup stage.
+
+Heavy imports and I/O are kept out of module import time; they happen here,
+in named phases, so every process (API worker, bot, script) pays for them
+once, up front, and can say how long each step took:
+
+    report = StartupReport()
+    async with report.phase("pools"):
+        await pools.start(...)
+    report.mark_ready()
+
+`python -m src.python.utils.startup` (or scripts/warmup.sh) runs the
+standalone warmup: it builds the calendar indexes and publishes them to the
+Redis tier, so API workers that start afterwards load instead of build.
+"""
+import os
+import sys
+import time
+import json
+import asyncio
+import logging
+import argparse
+import importlib
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+WARMUP_IMPORTS = [m for m in os.getenv(
+    "WARMUP_IMPORTS", "pandas,pandas_market_calendars,ccxt.async_support,redis.asyncio").split(",") if m]
+WARMUP_EXCHANGES = [e for e in os.getenv("WARMUP_EXCHANGES", "").split(",") if e]
+
+
+class StartupReport:
+    """Per-phase wall time of a process start, plus the readiness flag."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.phases: List[dict] = []
+        self.ready = False
+        self.ready_after_ms: Optional[float] = None
+
+    @asynccontextmanager
+    async def phase(self, name: str, required: bool = True):
+        """
+        Times one startup step. A failing optional phase is recorded and logged
+        but does not abort startup; a failing required phase re-raises.
+        """
+        start = time.perf_counter()
+        entry = {"phase": name, "ms": None, "ok": True}
+        self.phases.append(entry)
+        try:
+            yield entry
+        except Exception as e:
+            entry.update(ok=False, error=str(e) or type(e).__name__)
+            logger.error(f"Startup phase {name} failed: {e}")
+            if required:
+                raise
+        finally:
+            entry["ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    def mark_ready(self):
+        self.ready = True
+        self.ready_after_ms = round((time.perf_counter() - self._t0) * 1000, 1)
+        slowest = sorted(self.phases, key=lambda p: p["ms"] or 0, reverse=True)[:3]
+        summary = ", ".join(f"{p['phase']} {p['ms']}ms" for p in slowest)
+        logger.info(f"Ready in {self.ready_after_ms}ms (slowest: {summary})")
+
+    def as_dict(self) -> dict:
+        return {"ready": self.ready, "ready_after_ms": self.ready_after_ms,
+                "started_at": self.started_at, "phases": self.phases}
+
+
+def preload_imports(modules: List[str] = WARMUP_IMPORTS) -> List[str]:
+    """Imports the heavy optional dependencies now; returns the ones that are missing."""
+    missing = []
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            missing.append(name)
+    return missing
+
+
+async def load_settings(report: StartupReport):
+    """.env and the persisted runtime config: small reads every process needs first."""
+    from dotenv import load_dotenv
+    from src.python.utils.config_store import config_store
+
+    async with report.phase("env"):
+        load_dotenv()
+    async with report.phase("config"):
+        config_store.load()
+
+
+async def warm_core(report: StartupReport, exchanges: Optional[List[str]] = None):
+    """
+    Core-engine warmup shared by the API and the standalone script: heavy
+    imports, holiday tables and calendar indexes (pushed to the Redis tier).
+    """
+    from src.python.utils import market_calendar
+
+    async with report.phase("imports", required=False) as entry:
+        missing = await asyncio.to_thread(preload_imports)
+        if missing:
+            entry["missing"] = missing
+    async with report.phase("holidays"):
+        await asyncio.to_thread(market_calendar.load_holiday_config)
+    async with report.phase("calendar", required=False):
+        await market_calendar.calendar_service.warmup(exchanges or WARMUP_EXCHANGES or None)
+
+
+async def _wait_for_api(url: str, timeout: float) -> bool:
+    import urllib.request
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with await asyncio.to_thread(urllib.request.urlopen, url, timeout=2) as resp:
+                if resp.status == 200:
+                    return True
+        except Exception:
+            pass
+        await asyncio.sleep(0.5)
+    return False
+
+
+async def _main(args) -> int:
+    from src.python.utils.market_calendar import calendar_service
+    report = StartupReport()
+    try:
+        await load_settings(report)
+        await warm_core(report, args.exchanges.split(",") if args.exchanges else None)
+        report.mark_ready()
+        if args.wait_api:
+            async with report.phase("api_ready", required=False) as entry:
+                entry["ok"] = await _wait_for_api(args.wait_api, args.timeout)
+    except Exception:
+        pass  # already recorded in the report
+    finally:
+        await calendar_service.close()
+    print(json.dumps(report.as_dict(), indent=None if args.json else 2))
+    return 0 if report.ready and all(p["ok"] for p in report.phases) else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Warm calendars/caches and report per-phase startup time")
+    parser.add_argument("--exchanges", help="Comma-separated exchanges to index (default: configured one)")
+    parser.add_argument("--wait-api", metavar="URL", help="Then poll this readiness URL until it returns 200")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--json", action="store_true", help="One-line JSON report")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
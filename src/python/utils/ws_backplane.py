@@ -0,0 +1,205 @@
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+WS_BACKPLANE_URL = os.getenv("WS_BACKPLANE_URL")  # unset = single-process fan-out only
+WS_BACKPLANE_STREAM = os.getenv("WS_BACKPLANE_STREAM", "metron:ws")
+WS_BACKPLANE_MAXLEN = int(os.getenv("WS_BACKPLANE_MAXLEN", 10000))
+WS_BACKPLANE_FLUSH = float(os.getenv("WS_BACKPLANE_FLUSH", 0.01))  # seconds
+WS_BACKPLANE_MAX_BATCH = int(os.getenv("WS_BACKPLANE_MAX_BATCH", 500))
+
+
+def make_envelope(message: dict, channel: str, symbol: Optional[str] = None,
+                  strategy: Optional[str] = None, topic: Optional[str] = None) -> dict:
+    """Wire format shared by API workers and the bot process."""
+    return {"message": message, "channel": channel, "symbol": symbol, "strategy": strategy, "topic": topic}
+
+
+def _decode(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class MemoryStream:
+    """
+    In-memory stand-in for the Redis stream commands the backplane uses
+    (XADD/XREAD/XREVRANGE), for tests / single process without Redis.
+    """
+
+    def __init__(self):
+        self.streams: Dict[str, List[tuple]] = {}
+        self._seq = 0
+        self._changed = asyncio.Event()
+
+    @staticmethod
+    def _seq_of(entry_id: str) -> int:
+        return int(_decode(entry_id).split("-")[1])
+
+    async def xadd(self, name: str, fields: dict, maxlen: Optional[int] = None, approximate: bool = True) -> str:
+        self._seq += 1
+        entry_id = f"{int(time.time() * 1000)}-{self._seq}"
+        entries = self.streams.setdefault(name, [])
+        entries.append((entry_id, dict(fields)))
+        if maxlen and len(entries) > maxlen:
+            del entries[:len(entries) - maxlen]
+        self._changed.set()
+        return entry_id
+
+    async def xrevrange(self, name: str, max: str = "+", min: str = "-", count: Optional[int] = None) -> list:
+        entries = list(reversed(self.streams.get(name, [])))
+        return entries[:count] if count else entries
+
+    async def xread(self, streams: Dict[str, str], count: Optional[int] = None, block: Optional[int] = None) -> list:
+        deadline = time.monotonic() + (block or 0) / 1000
+        while True:
+            result = []
+            for name, last_id in streams.items():
+                last = self._seq_of(last_id)
+                newer = [e for e in self.streams.get(name, []) if self._seq_of(e[0]) > last]
+                if newer:
+                    result.append([name, newer[:count] if count else newer])
+            remaining = deadline - time.monotonic()
+            if result or block is None or remaining <= 0:
+                return result
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def aclose(self):
+        pass
+
+
+class Backplane:
+    """
+    Cross-process fan-out over a Redis stream. Outgoing envelopes are batched
+    into one XADD per flush interval; a reader task XREADs from the last seen
+    entry id and hands foreign envelopes to `on_message`. After a connection
+    error the reader reconnects and resumes from that id, so nothing published
+    while it was away is lost (within WS_BACKPLANE_MAXLEN entries).
+    """
+
+    def __init__(self, client, on_message: Optional[Callable[[dict], None]] = None,
+                 stream: str = WS_BACKPLANE_STREAM, origin: Optional[str] = None):
+        self.client = client
+        self.on_message = on_message
+        self.stream = stream
+        self.origin = origin or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        # Bounded: while Redis is down the oldest envelopes fall off the left
+        self._outbox: deque = deque(maxlen=WS_BACKPLANE_MAX_BATCH * 10)
+        self._flush_now = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self.last_id: Optional[str] = None
+        self.counters = {"published": 0, "batches": 0, "received": 0, "reconnects": 0, "dropped": 0,
+                         "handler_errors": 0}
+
+    def publish(self, envelope: dict):
+        """Queues an envelope for the next batch; never awaits Redis."""
+        if len(self._outbox) == self._outbox.maxlen:
+            self.counters["dropped"] += 1  # Redis is down for a while: keep the newest
+        self._outbox.append(envelope)
+        if len(self._outbox) >= WS_BACKPLANE_MAX_BATCH:
+            self._flush_now.set()
+
+    async def flush(self):
+        while self._outbox:
+            # Taken off before the await so envelopes published meanwhile can't shift it
+            batch = [self._outbox.popleft() for _ in range(min(len(self._outbox), WS_BACKPLANE_MAX_BATCH))]
+            try:
+                await self.client.xadd(
+                    self.stream,
+                    {"origin": self.origin, "data": json.dumps(batch, default=str)},
+                    maxlen=WS_BACKPLANE_MAXLEN, approximate=True,
+                )
+            except BaseException:
+                # Put it back for the retry; anything past maxlen is dropped from the newest end
+                overflow = len(self._outbox) + len(batch) - self._outbox.maxlen
+                self.counters["dropped"] += max(overflow, 0)
+                self._outbox.extendleft(reversed(batch))
+                raise
+            self.counters["published"] += len(batch)
+            self.counters["batches"] += 1
+
+    async def _flusher(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), WS_BACKPLANE_FLUSH)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Backplane publish failed, will retry: {e}")
+                await asyncio.sleep(1)
+
+    async def _tail_id(self) -> str:
+        latest = await self.client.xrevrange(self.stream, count=1)
+        return _decode(latest[0][0]) if latest else "0-0"
+
+    async def _reader(self):
+        backoff = 0.5
+        while True:
+            try:
+                if self.last_id is None:
+                    self.last_id = await self._tail_id()
+                response = await self.client.xread({self.stream: self.last_id}, count=100, block=1000)
+                backoff = 0.5
+                for _, entries in response or []:
+                    for entry_id, fields in entries:
+                        self.last_id = _decode(entry_id)
+                        fields = {_decode(k): v for k, v in fields.items()}
+                        if _decode(fields.get("origin")) == self.origin:
+                            continue  # already delivered locally
+                        try:
+                            envelopes = json.loads(_decode(fields["data"]))
+                        except (KeyError, ValueError) as e:
+                            self.counters["handler_errors"] += 1
+                            logger.warning(f"Skipping malformed backplane entry {self.last_id}: {e}")
+                            continue
+                        for envelope in envelopes:
+                            self.counters["received"] += 1
+                            try:
+                                self.on_message(envelope)
+                            except Exception:
+                                # A handler bug is not a Redis failure: keep delivering this batch
+                                self.counters["handler_errors"] += 1
+                                logger.exception("Backplane message handler failed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.counters["reconnects"] += 1
+                logger.warning(f"Backplane read failed, resuming from {self.last_id} in {backoff}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    async def start(self):
+        self._tasks.append(asyncio.create_task(self._flusher()))
+        if self.on_message is not None:
+            self._tasks.append(asyncio.create_task(self._reader()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f"Backplane final flush failed: {e}")
+        await self.client.aclose()
+
+
+def create_backplane(url: Optional[str] = WS_BACKPLANE_URL, on_message: Optional[Callable[[dict], None]] = None) -> Backplane:
+    """Redis-backed backplane for `url`, or the in-memory stream for url 'memory://'."""
+    if url == "memory://":
+        return Backplane(MemoryStream(), on_message)
+    import redis.asyncio as aioredis
+    return Backplane(aioredis.from_url(url), on_message)